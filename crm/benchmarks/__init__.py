@@ -0,0 +1,23 @@
+"""
+Benchmark suite for the CRM API.
+
+Seed a database, replay the API scenarios in-process and store the results
+as JSON so they can be compared across commits:
+
+    python -m benchmarks.runner --employees 200 --tickets 5000
+    python -m benchmarks.compare results/old.json results/new.json
+
+By default the suite runs against a throwaway SQLite file. Set
+``BENCH_DB=postgres`` to use a local PostgreSQL database instead (see
+``benchmarks/settings.py``).
+"""
+
+import os
+
+
+def setup_django():
+    """Configure Django with the benchmark settings unless told otherwise"""
+    import django
+
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'benchmarks.settings')
+    django.setup()
@@ -0,0 +1,44 @@
+"""
+Compare two benchmark result files.
+
+    python -m benchmarks.compare results/before.json results/after.json
+"""
+
+import argparse
+import json
+
+METRICS = ['req_per_sec', 'p50_ms', 'p95_ms', 'p99_ms', 'queries_per_request']
+
+
+def _change(before, after):
+    if not before:
+        return '     n/a'
+    return f'{(after - before) / before * 100:+7.1f}%'
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('before')
+    parser.add_argument('after')
+    args = parser.parse_args(argv)
+
+    with open(args.before) as fh:
+        before = json.load(fh)
+    with open(args.after) as fh:
+        after = json.load(fh)
+
+    print(f"before: {before['meta'].get('commit')}  after: {after['meta'].get('commit')}")
+    for name, result in after['scenarios'].items():
+        previous = before['scenarios'].get(name)
+        if previous is None:
+            print(f'{name}: new scenario')
+            continue
+        print(name)
+        for metric in METRICS:
+            if metric not in result or metric not in previous:
+                continue
+            print(f'  {metric:20} {previous[metric]:>10} -> {result[metric]:>10}  {_change(previous[metric], result[metric])}')
+
+
+if __name__ == '__main__':
+    main()
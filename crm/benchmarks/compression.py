@@ -0,0 +1,63 @@
+"""
+Measure API response compression: bandwidth and CPU per request.
+
+    python -m benchmarks.compression --sizes 10 100 1000 10000
+
+Renders ticket lists of each size as JSON and passes them through
+CompressionMiddleware once per encoding, reporting the bytes sent and the
+CPU time spent compressing.
+"""
+
+import argparse
+import time
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10, 100, 1000, 10000],
+                        help='Numbers of tickets in the list')
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--output', help='Result file (default: benchmarks/results/compression-<commit>-<time>.json)')
+    args = parser.parse_args(argv)
+
+    from benchmarks import setup_django
+    setup_django()
+
+    from django.http import HttpResponse
+    from django.test import RequestFactory
+    from crm.middleware import CompressionMiddleware, brotli
+    from crm.renderers import FastJSONRenderer
+    from benchmarks.renderers import build_payload
+    from benchmarks.utils import run_metadata, write_results
+
+    encodings = ['identity', 'gzip'] + (['br'] if brotli is not None else [])
+    factory = RequestFactory()
+    renderer = FastJSONRenderer()
+    results = {'meta': run_metadata(repeat=args.repeat, encodings=encodings), 'sizes': {}}
+
+    for size in args.sizes:
+        body = renderer.render(build_payload(size))
+        middleware = CompressionMiddleware(lambda request: HttpResponse(body, content_type='application/json'))
+        results['sizes'][size] = {}
+        for encoding in encodings:
+            request = factory.get('/api/tickets/list/', HTTP_ACCEPT_ENCODING=encoding)
+            cpu = 0.0
+            for _ in range(args.repeat):
+                started = time.process_time()
+                response = middleware(request)
+                cpu += time.process_time() - started
+            sent = len(response.content)
+            results['sizes'][size][encoding] = {
+                'bytes': sent,
+                'ratio': round(sent / len(body), 4),
+                'cpu_ms_per_request': round(cpu / args.repeat * 1000, 3),
+            }
+            print(f"{size:>6} tickets  {encoding:8} {sent:>12,} bytes ({sent / len(body):6.1%})  "
+                  f"{cpu / args.repeat * 1000:8.3f} ms CPU")
+
+    output = write_results(results, args.output, prefix='compression')
+    print(f'Results written to {output}')
+
+
+if __name__ == '__main__':
+    main()
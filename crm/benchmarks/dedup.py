@@ -0,0 +1,75 @@
+"""
+Measure the ingest overhead of duplicate ticket detection.
+
+    python -m benchmarks.dedup --tickets 20000 --iterations 500
+
+Seeds the benchmark database, then times fingerprinting and the duplicate
+lookup per incoming ticket and compares them with the ticket INSERT.
+"""
+
+import argparse
+import time
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--employees', type=int, default=10)
+    parser.add_argument('--tickets', type=int, default=20000)
+    parser.add_argument('--iterations', type=int, default=500)
+    parser.add_argument('--output', help='Result file (default: benchmarks/results/dedup-<commit>-<time>.json)')
+    args = parser.parse_args(argv)
+
+    from benchmarks import setup_django
+    setup_django()
+
+    from django.db import connection
+    from ticket.dedup import find_duplicate, fingerprint_ticket
+    from ticket.models import Ticket
+    from benchmarks.seed import prepare_database, seed
+    from benchmarks.utils import run_metadata, summarize_timings, write_results
+
+    prepare_database()
+    seed(args.employees, args.tickets)
+
+    timings = {'fingerprint': [], 'lookup': [], 'insert': []}
+    for i in range(args.iterations):
+        data = {
+            'name': f'Incoming ticket {i % 50}',
+            'description': f'Customer {i % 50} reports that the service stopped working.',
+            'source': 'phone',
+            'phone_number': f'+1555{i % 50:07d}',
+        }
+
+        started = time.perf_counter()
+        fingerprint, signature = fingerprint_ticket(data)
+        timings['fingerprint'].append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        duplicate_of = find_duplicate(fingerprint, signature)
+        timings['lookup'].append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        Ticket.objects.create(
+            fingerprint=fingerprint, shingle_signature=signature, duplicate_of_id=duplicate_of, **data
+        )
+        timings['insert'].append(time.perf_counter() - started)
+
+    results = {
+        'meta': run_metadata(database=connection.vendor, tickets=args.tickets, iterations=args.iterations),
+        'steps': {name: summarize_timings(samples) for name, samples in timings.items()},
+    }
+    insert_ms = results['steps']['insert']['mean_ms']
+    overhead_ms = results['steps']['fingerprint']['mean_ms'] + results['steps']['lookup']['mean_ms']
+    results['overhead_ms_per_ticket'] = round(overhead_ms, 3)
+    results['overhead_vs_insert'] = round(overhead_ms / insert_ms, 3) if insert_ms else None
+
+    for name, summary in results['steps'].items():
+        print(f"{name:12} mean {summary['mean_ms']:8.3f} ms  p99 {summary['p99_ms']:8.3f} ms")
+    print(f"Detection overhead: {overhead_ms:.3f} ms per ticket ({results['overhead_vs_insert']:.0%} of the INSERT)")
+
+    output = write_results(results, args.output, prefix='dedup')
+    print(f'Results written to {output}')
+
+
+if __name__ == '__main__':
+    main()
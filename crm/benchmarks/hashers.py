@@ -0,0 +1,97 @@
+"""
+Measure password verification throughput per hasher configuration.
+
+    PASSWORD_ARGON2_MEMORY_COST=65536 python -m benchmarks.hashers --iterations 20
+
+Runs single-threaded, so the logins/sec figures are per CPU core. Cost
+parameters come from the PASSWORD_* settings (see crm/settings.py). The
+login cache hit is timed against a seeded benchmark database and the
+configured cache backend.
+"""
+
+import argparse
+import time
+
+PASSWORD = 'bench-password-123'
+
+
+def hasher_configurations():
+    from django.contrib.auth.hashers import PBKDF2PasswordHasher
+    from user.hashers import (
+        TunedArgon2PasswordHasher,
+        TunedPBKDF2PasswordHasher,
+        TunedScryptPasswordHasher,
+    )
+
+    configurations = {
+        'pbkdf2 (django default)': PBKDF2PasswordHasher(),
+        'pbkdf2 (configured)': TunedPBKDF2PasswordHasher(),
+        'scrypt (configured)': TunedScryptPasswordHasher(),
+    }
+    try:
+        import argon2  # noqa: F401
+        configurations['argon2 (configured)'] = TunedArgon2PasswordHasher()
+    except ImportError:
+        print('argon2-cffi is not installed, skipping argon2')
+    return configurations
+
+
+def measure(verify, iterations):
+    timings = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        verify()
+        timings.append(time.perf_counter() - started)
+    return timings
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--iterations', type=int, default=20)
+    parser.add_argument('--output', help='Result file (default: benchmarks/results/hashers-<commit>-<time>.json)')
+    args = parser.parse_args(argv)
+
+    from benchmarks import setup_django
+    setup_django()
+
+    from django.conf import settings
+    from django.contrib.auth import get_user_model
+    from django.contrib.auth.hashers import get_hasher
+    from django.test import override_settings
+    from user.login_cache import get_cached_login, remember_login
+    from benchmarks.seed import BENCH_PASSWORD, prepare_database, seed
+    from benchmarks.utils import run_metadata, summarize_timings, write_results
+
+    results = {'meta': run_metadata(iterations=args.iterations), 'configurations': {}}
+
+    def report(name, timings, **extra):
+        result = summarize_timings(timings)
+        # Single-threaded, so requests per second is logins per second per core
+        result['logins_per_sec_per_core'] = result.pop('req_per_sec')
+        result.update(extra)
+        results['configurations'][name] = result
+        print(f"{name:26} {result['logins_per_sec_per_core']:>10.1f} logins/s/core  p50 {result['p50_ms']:>9.3f} ms")
+
+    for name, hasher in hasher_configurations().items():
+        encoded = hasher.encode(PASSWORD, hasher.salt())
+        timings = measure(lambda: hasher.verify(PASSWORD, encoded), args.iterations)
+        report(name, timings, algorithm=hasher.algorithm, params=hasher.safe_summary(encoded))
+
+    # A full login cache hit: key derivation, cache get and the user lookup.
+    # The benchmark settings turn the cache off, enable it just for this.
+    prepare_database()
+    user = get_user_model().objects.get(pk=seed(employees=1, tickets=0)['employee_ids'][0])
+    with override_settings(LOGIN_CACHE_TIMEOUT=60):
+        remember_login(user.username, BENCH_PASSWORD, user)
+        if get_cached_login(user.username, BENCH_PASSWORD) != user:
+            raise RuntimeError('Login cache miss, is the cache backend reachable?')
+        timings = measure(lambda: get_cached_login(user.username, BENCH_PASSWORD), args.iterations * 10)
+    report('login cache hit', timings, cache_backend=settings.CACHES['default']['BACKEND'])
+
+    results['meta']['preferred_hasher'] = get_hasher().algorithm
+    output = write_results(results, args.output, prefix='hashers')
+    print(f'Results written to {output}')
+
+
+if __name__ == '__main__':
+    main()
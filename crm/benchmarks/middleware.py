@@ -0,0 +1,97 @@
+"""
+Measure per-request middleware overhead of the settings profiles.
+
+    python -m benchmarks.middleware --iterations 2000
+
+A trivial view at /api/ping/ is requested (GET and a CORS preflight) with
+no middleware at all, with the default MIDDLEWARE from crm/settings.py and
+with the API profile from crm/settings_api.py. The overhead is the
+difference to the no-middleware baseline.
+"""
+
+import argparse
+import time
+
+from django.http import JsonResponse
+from django.urls import path
+
+
+def ping(request):
+    return JsonResponse({'ok': True})
+
+
+urlpatterns = [
+    path('api/ping/', ping),
+]
+
+
+def measure(client, request, iterations, warmup):
+    for _ in range(warmup):
+        request(client)
+    timings = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        request(client)
+        timings.append(time.perf_counter() - started)
+    return timings
+
+
+REQUESTS = {
+    'get': lambda client: client.get('/api/ping/'),
+    'preflight': lambda client: client.options(
+        '/api/ping/',
+        HTTP_ORIGIN='http://localhost:3000',
+        HTTP_ACCESS_CONTROL_REQUEST_METHOD='POST',
+    ),
+}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--iterations', type=int, default=2000)
+    parser.add_argument('--warmup', type=int, default=50)
+    parser.add_argument('--output', help='Result file (default: benchmarks/results/middleware-<commit>-<time>.json)')
+    args = parser.parse_args(argv)
+
+    from benchmarks import setup_django
+    setup_django()
+
+    from django.test import Client, override_settings
+    from django.test.utils import setup_test_environment
+    from crm import settings as full_profile, settings_api as api_profile
+    from benchmarks.utils import run_metadata, summarize_timings, write_results
+
+    setup_test_environment()
+    profiles = {
+        'none': {'MIDDLEWARE': []},
+        'full': {'MIDDLEWARE': full_profile.MIDDLEWARE},
+        'api': {
+            'MIDDLEWARE': api_profile.MIDDLEWARE,
+            'NON_API_MIDDLEWARE': api_profile.NON_API_MIDDLEWARE,
+            'API_PATH_PREFIX': api_profile.API_PATH_PREFIX,
+        },
+    }
+
+    results = {'meta': run_metadata(iterations=args.iterations), 'profiles': {}}
+    for profile, overrides in profiles.items():
+        results['profiles'][profile] = {}
+        with override_settings(ROOT_URLCONF=__name__, **overrides):
+            client = Client()
+            for name, request in REQUESTS.items():
+                results['profiles'][profile][name] = summarize_timings(
+                    measure(client, request, args.iterations, args.warmup)
+                )
+
+    for profile, requests in results['profiles'].items():
+        for name, summary in requests.items():
+            baseline = results['profiles']['none'][name]['mean_ms']
+            summary['overhead_ms'] = round(summary['mean_ms'] - baseline, 3)
+            print(f"{profile:5} {name:10} mean {summary['mean_ms']:7.3f} ms  "
+                  f"p99 {summary['p99_ms']:7.3f} ms  overhead {summary['overhead_ms']:7.3f} ms")
+
+    output = write_results(results, args.output, prefix='middleware')
+    print(f'Results written to {output}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+"""
+Compare response encoders on a large ticket list.
+
+    python -m benchmarks.renderers --tickets 10000
+
+Serializes the tickets once with TicketSerializer, then reports the
+encoded size and the encoding time of every renderer. No database is
+needed.
+"""
+
+import argparse
+import time
+
+
+def build_payload(count):
+    from django.contrib.auth import get_user_model
+    from django.utils import timezone
+    from ticket.models import Ticket
+    from ticket.serializers import TicketSerializer
+
+    User = get_user_model()
+    now = timezone.now()
+    owner = User(id=1, username='owner', email='owner@example.com', first_name='Ticket', last_name='Owner')
+    tickets = [
+        Ticket(
+            id=i,
+            name=f'Ticket {i}',
+            description=f'Customer reported problem number {i}, please call back.',
+            status='open',
+            source='email',
+            priority='medium',
+            owner=owner,
+            phone_number='+15550000000',
+            created_at=now,
+            updated_at=now,
+        )
+        for i in range(count)
+    ]
+    return TicketSerializer(tickets, many=True).data
+
+
+def renderer_configurations():
+    from rest_framework.renderers import JSONRenderer
+    from crm.renderers import FastJSONRenderer, MessagePackRenderer, msgpack, orjson
+
+    configurations = {'json (drf/stdlib)': JSONRenderer()}
+    if orjson is not None:
+        configurations['json (orjson)'] = FastJSONRenderer()
+    else:
+        print('orjson is not installed, skipping it')
+    if msgpack is not None:
+        configurations['msgpack'] = MessagePackRenderer()
+    else:
+        print('msgpack is not installed, skipping it')
+    return configurations
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--tickets', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=10)
+    parser.add_argument('--output', help='Result file (default: benchmarks/results/renderers-<commit>-<time>.json)')
+    args = parser.parse_args(argv)
+
+    from benchmarks import setup_django
+    setup_django()
+
+    from benchmarks.utils import run_metadata, summarize_timings, write_results
+
+    payload = build_payload(args.tickets)
+    results = {'meta': run_metadata(tickets=args.tickets, repeat=args.repeat), 'formats': {}}
+
+    for name, renderer in renderer_configurations().items():
+        timings = []
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            body = renderer.render(payload, renderer.media_type, {})
+            timings.append(time.perf_counter() - started)
+        summary = summarize_timings(timings)
+        results['formats'][name] = {
+            'bytes': len(body),
+            'p50_ms': summary['p50_ms'],
+            'mean_ms': summary['mean_ms'],
+        }
+        print(f"{name:20} {len(body):>12,} bytes  p50 {summary['p50_ms']:>9.2f} ms")
+
+    output = write_results(results, args.output, prefix='renderers')
+    print(f'Results written to {output}')
+
+
+if __name__ == '__main__':
+    main()
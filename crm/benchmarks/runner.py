@@ -0,0 +1,110 @@
+"""
+Run the API benchmark scenarios and store the results as JSON.
+
+    python -m benchmarks.runner --employees 200 --tickets 5000 --iterations 200
+
+For every scenario the runner reports requests per second, p50/p95/p99
+latency and the number of database queries per request.
+"""
+
+import argparse
+import time
+from collections import Counter
+
+
+def run_scenario(scenario, context, iterations, warmup):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    for i in range(warmup):
+        scenario(context, i)
+
+    timings = []
+    queries = []
+    statuses = Counter()
+    for i in range(warmup, warmup + iterations):
+        with CaptureQueriesContext(connection) as captured:
+            started = time.perf_counter()
+            response = scenario(context, i)
+            timings.append(time.perf_counter() - started)
+        queries.append(len(captured))
+        statuses[str(response.status_code)] += 1
+
+    from benchmarks.utils import summarize_timings
+
+    result = summarize_timings(timings)
+    result.update({
+        'queries_per_request': round(sum(queries) / len(queries), 2) if queries else 0.0,
+        'max_queries': max(queries, default=0),
+        'status_codes': dict(statuses),
+    })
+    return result
+
+
+def main(argv=None):
+    from benchmarks.scenarios import SCENARIOS
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--employees', type=int, default=100)
+    parser.add_argument('--tickets', type=int, default=1000)
+    parser.add_argument('--iterations', type=int, default=100)
+    parser.add_argument('--warmup', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--scenario', action='append', choices=sorted(SCENARIOS),
+                        help='Run only this scenario (repeatable)')
+    parser.add_argument('--output', help='Result file (default: benchmarks/results/api-<commit>-<time>.json)')
+    args = parser.parse_args(argv)
+
+    from benchmarks import setup_django
+    setup_django()
+
+    from django.db import connection
+    from django.test import Client
+    from django.test.utils import setup_test_environment
+    from rest_framework_simplejwt.tokens import RefreshToken
+    from django.contrib.auth import get_user_model
+
+    from benchmarks.seed import prepare_database, seed
+    from benchmarks.utils import run_metadata, write_results
+
+    setup_test_environment()
+    prepare_database()
+    created = seed(args.employees, args.tickets, args.seed)
+    if not created['employee_ids'] or not created['ticket_ids']:
+        parser.error('--employees and --tickets must both be at least 1')
+
+    User = get_user_model()
+    user = User.objects.get(id=created['employee_ids'][0])
+    context = {
+        'client': Client(),
+        'access': str(RefreshToken.for_user(user).access_token),
+        'usernames': list(User.objects.order_by('id').values_list('username', flat=True)[:20]),
+        'employee_ids': created['employee_ids'],
+        'ticket_ids': created['ticket_ids'],
+    }
+
+    results = {
+        'meta': run_metadata(
+            database=connection.vendor,
+            employees=args.employees,
+            tickets=args.tickets,
+            iterations=args.iterations,
+            warmup=args.warmup,
+        ),
+        'scenarios': {},
+    }
+    for name in args.scenario or SCENARIOS:
+        result = run_scenario(SCENARIOS[name], context, args.iterations, args.warmup)
+        results['scenarios'][name] = result
+        print(
+            f"{name:24} {result['req_per_sec']:>9.1f} req/s  "
+            f"p50 {result['p50_ms']:>8.2f} ms  p95 {result['p95_ms']:>8.2f} ms  "
+            f"p99 {result['p99_ms']:>8.2f} ms  {result['queries_per_request']:>7.1f} queries"
+        )
+
+    output = write_results(results, args.output)
+    print(f'Results written to {output}')
+
+
+if __name__ == '__main__':
+    main()
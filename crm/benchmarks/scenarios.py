@@ -0,0 +1,97 @@
+"""
+Scripted API scenarios replayed by the benchmark runner.
+
+Each scenario is a function ``(context, iteration) -> response`` where the
+context holds a Django test client, the JWT of a seeded employee and the
+seeded ids.
+"""
+
+from django.urls import reverse
+
+from benchmarks.seed import BENCH_PASSWORD
+
+
+def _auth(context):
+    return {'HTTP_AUTHORIZATION': f"Bearer {context['access']}"}
+
+
+def login(context, iteration):
+    employee = context['usernames'][iteration % len(context['usernames'])]
+    return context['client'].post(
+        reverse('login'),
+        {'username': employee, 'password': BENCH_PASSWORD},
+        content_type='application/json',
+    )
+
+
+def ticket_list(context, iteration):
+    return context['client'].get(reverse('ticket:ticket-list'), **_auth(context))
+
+
+def ticket_list_filtered(context, iteration):
+    return context['client'].get(
+        reverse('ticket:ticket-list'),
+        {'status': 'open', 'priority': 'high'},
+        **_auth(context)
+    )
+
+
+def ticket_list_by_owner(context, iteration):
+    owner_id = context['employee_ids'][iteration % len(context['employee_ids'])]
+    return context['client'].get(
+        reverse('ticket:ticket-list'), {'owner': owner_id}, **_auth(context)
+    )
+
+
+def ticket_detail(context, iteration):
+    ticket_id = context['ticket_ids'][iteration % len(context['ticket_ids'])]
+    return context['client'].get(reverse('ticket:ticket-detail', args=[ticket_id]), **_auth(context))
+
+
+def ticket_batch(context, iteration):
+    ticket_ids = context['ticket_ids']
+    start = iteration % len(ticket_ids)
+    ids = ','.join(str(ticket_id) for ticket_id in ticket_ids[start:start + 50])
+    return context['client'].get(reverse('ticket:ticket-batch'), {'ids': ids}, **_auth(context))
+
+
+def ticket_create(context, iteration):
+    return context['client'].post(
+        reverse('ticket:create-ticket'),
+        {
+            'name': f'Created ticket {iteration}',
+            'description': 'Ticket created by the benchmark runner',
+            'source': 'Email',
+            'priority': 'high',
+            'phone_number': '+15550000000',
+        },
+        content_type='application/json',
+        **_auth(context)
+    )
+
+
+def ticket_update(context, iteration):
+    ticket_id = context['ticket_ids'][iteration % len(context['ticket_ids'])]
+    return context['client'].patch(
+        reverse('ticket:update-ticket', args=[ticket_id]),
+        {'status': 'Pending' if iteration % 2 else 'Open'},
+        content_type='application/json',
+        **_auth(context)
+    )
+
+
+def user_list(context, iteration):
+    return context['client'].get(reverse('user-list'), **_auth(context))
+
+
+SCENARIOS = {
+    'login': login,
+    'ticket_list': ticket_list,
+    'ticket_list_filtered': ticket_list_filtered,
+    'ticket_list_by_owner': ticket_list_by_owner,
+    'ticket_detail': ticket_detail,
+    'ticket_batch': ticket_batch,
+    'ticket_create': ticket_create,
+    'ticket_update': ticket_update,
+    'user_list': user_list,
+}
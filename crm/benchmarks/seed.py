@@ -0,0 +1,98 @@
+"""
+Seed the benchmark database with employees and tickets.
+
+    python -m benchmarks.seed --employees 200 --tickets 5000
+"""
+
+import argparse
+import random
+
+BENCH_PASSWORD = 'bench-password-123'
+
+STATUSES = ['new', 'open', 'pending', 'resolved', 'closed']
+PRIORITIES = ['low', 'medium', 'high', 'urgent']
+SOURCES = ['email', 'phone', 'web', 'chat']
+
+BATCH_SIZE = 1000
+
+
+def prepare_database():
+    """Create the tables (the apps ship without migrations) and empty them"""
+    from django.core.management import call_command
+    from django.contrib.auth import get_user_model
+    from ticket.models import Ticket
+
+    call_command('migrate', run_syncdb=True, verbosity=0)
+    Ticket.objects.all().delete()
+    get_user_model().objects.all().delete()
+
+
+def seed(employees, tickets, seed_value=0):
+    """
+    Insert ``employees`` employees and ``tickets`` tickets.
+
+    Every employee shares BENCH_PASSWORD so the login scenario can use any
+    of them; the password is hashed once instead of once per employee.
+    Returns a dict with the created employee and ticket ids.
+    """
+    from django.contrib.auth import get_user_model
+    from django.contrib.auth.hashers import make_password
+    from ticket.models import Ticket
+
+    User = get_user_model()
+    rng = random.Random(seed_value)
+    password = make_password(BENCH_PASSWORD)
+
+    User.objects.bulk_create(
+        [
+            User(
+                username=f'bench-user-{i}',
+                email=f'bench-user-{i}@example.com',
+                password=password,
+                first_name='Bench',
+                last_name=f'User {i}',
+                phone_number=f'+1555{i:07d}',
+                employee_type=rng.choice(User.EmployeeType.values),
+                is_staff=(i == 0),
+            )
+            for i in range(employees)
+        ],
+        batch_size=BATCH_SIZE,
+    )
+    employee_ids = list(User.objects.order_by('id').values_list('id', flat=True))
+
+    for start in range(0, tickets, BATCH_SIZE):
+        Ticket.objects.bulk_create([
+            Ticket(
+                name=f'Benchmark ticket {i}',
+                description=f'Seeded ticket number {i} for benchmarking the API.',
+                status=rng.choice(STATUSES),
+                source=rng.choice(SOURCES),
+                priority=rng.choice(PRIORITIES),
+                owner_id=rng.choice(employee_ids) if employee_ids else None,
+                phone_number=f'+1666{i:07d}',
+            )
+            for i in range(start, min(start + BATCH_SIZE, tickets))
+        ])
+    ticket_ids = list(Ticket.objects.order_by('id').values_list('id', flat=True))
+
+    return {'employee_ids': employee_ids, 'ticket_ids': ticket_ids}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--employees', type=int, default=100)
+    parser.add_argument('--tickets', type=int, default=1000)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    from benchmarks import setup_django
+    setup_django()
+
+    prepare_database()
+    created = seed(args.employees, args.tickets, args.seed)
+    print(f"Seeded {len(created['employee_ids'])} employees and {len(created['ticket_ids'])} tickets")
+
+
+if __name__ == '__main__':
+    main()
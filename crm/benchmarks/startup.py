@@ -0,0 +1,96 @@
+"""
+Measure process startup: import time per module and warm-up steps.
+
+    python -m benchmarks.startup --top 25
+
+Starts a fresh interpreter with ``-X importtime`` that sets up Django, loads
+the WSGI application and runs the warm-up from crm/warmup.py, then reports
+the slowest imports (self and cumulative time) and each warm-up step.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+
+CHILD_SCRIPT = """
+import json, time
+started = time.perf_counter()
+from crm.wsgi import application
+loaded = time.perf_counter() - started
+from crm.warmup import warm_up
+timings = warm_up(connect={connect})
+print(json.dumps({{'load_wsgi_application': loaded, **timings}}))
+"""
+
+
+def parse_importtime(stderr):
+    """Parse ``-X importtime`` output into {module: (self_us, cumulative_us)}"""
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        try:
+            self_us, cumulative_us, name = line[len('import time:'):].split('|')
+            modules[name.strip()] = (int(self_us), int(cumulative_us))
+        except ValueError:
+            continue
+    return modules
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--top', type=int, default=20, help='Number of modules to list')
+    parser.add_argument('--settings', default='benchmarks.settings', help='DJANGO_SETTINGS_MODULE for the child')
+    parser.add_argument('--connect', action='store_true', help='Also open the database connections')
+    parser.add_argument('--output', help='Result file (default: benchmarks/results/startup-<commit>-<time>.json)')
+    args = parser.parse_args(argv)
+
+    env = dict(os.environ, DJANGO_SETTINGS_MODULE=args.settings)
+    started = time.perf_counter()
+    child = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', CHILD_SCRIPT.format(connect=args.connect)],
+        cwd=PROJECT_DIR, env=env, capture_output=True, text=True,
+    )
+    wall = time.perf_counter() - started
+    if child.returncode:
+        sys.exit(child.stderr)
+
+    modules = parse_importtime(child.stderr)
+    steps = json.loads(child.stdout.strip().splitlines()[-1])
+
+    from benchmarks import setup_django
+    setup_django()
+    from benchmarks.utils import run_metadata, write_results
+
+    by_cumulative = sorted(modules.items(), key=lambda item: item[1][1], reverse=True)
+    by_self = sorted(modules.items(), key=lambda item: item[1][0], reverse=True)
+
+    print(f'Process wall time: {wall * 1000:.1f} ms, {len(modules)} modules imported')
+    print('Startup steps:')
+    for name, seconds in steps.items():
+        print(f'  {name:24} {seconds * 1000:9.1f} ms')
+    print(f'Slowest imports (cumulative, top {args.top}):')
+    for name, (self_us, cumulative_us) in by_cumulative[:args.top]:
+        print(f'  {cumulative_us / 1000:9.1f} ms  {name}')
+    print(f'Slowest imports (self, top {args.top}):')
+    for name, (self_us, cumulative_us) in by_self[:args.top]:
+        print(f'  {self_us / 1000:9.1f} ms  {name}')
+
+    results = {
+        'meta': run_metadata(settings=args.settings, connect=args.connect),
+        'wall_ms': round(wall * 1000, 1),
+        'steps_ms': {name: round(seconds * 1000, 3) for name, seconds in steps.items()},
+        'imports_us': {name: {'self': s, 'cumulative': c} for name, (s, c) in modules.items()},
+    }
+    output = write_results(results, args.output, prefix='startup')
+    print(f'Results written to {output}')
+
+
+if __name__ == '__main__':
+    main()
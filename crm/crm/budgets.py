@@ -0,0 +1,98 @@
+"""
+Query-count and latency budgets for the test suite.
+
+Use the mixin in a test case:
+
+    class TicketListBudgetTest(PerformanceBudgetMixin, APITestCase):
+        def test_list(self):
+            with self.assertQueryBudget(3), self.assertTimeBudget(0.5):
+                self.client.get(url)
+
+or decorate a whole test method:
+
+    @query_budget(3)
+    @time_budget(0.5)
+    def test_list(self):
+        ...
+
+Time budgets are multiplied by the PERF_BUDGET_SCALE environment variable
+(default 1.0) so slow CI machines can loosen them without editing tests.
+"""
+
+import functools
+import os
+import time
+from contextlib import contextmanager
+
+from django.db import connections
+from django.test.utils import CaptureQueriesContext
+
+
+def _time_scale():
+    return float(os.environ.get('PERF_BUDGET_SCALE', '1.0'))
+
+
+def _format_queries(captured):
+    return '\n'.join(
+        f"{i}. {query['sql']}" for i, query in enumerate(captured.captured_queries, start=1)
+    )
+
+
+@contextmanager
+def query_budget_context(test_case, max_queries, using='default', label=None):
+    """Fail ``test_case`` if the block runs more than ``max_queries`` queries on ``using``"""
+    with CaptureQueriesContext(connections[using]) as captured:
+        yield captured
+    executed = len(captured)
+    if executed > max_queries:
+        test_case.fail(
+            f"{label or 'Block'} ran {executed} queries, budget is {max_queries}:\n"
+            f"{_format_queries(captured)}"
+        )
+
+
+@contextmanager
+def time_budget_context(test_case, seconds, label=None):
+    """Fail ``test_case`` if the block takes longer than ``seconds`` (scaled)"""
+    budget = seconds * _time_scale()
+    started = time.perf_counter()
+    yield
+    elapsed = time.perf_counter() - started
+    if elapsed > budget:
+        test_case.fail(
+            f"{label or 'Block'} took {elapsed * 1000:.1f} ms, budget is {budget * 1000:.1f} ms"
+        )
+
+
+class PerformanceBudgetMixin:
+    """
+    Assertion helpers for query and time budgets, mix into a TestCase
+    """
+
+    def assertQueryBudget(self, max_queries, using='default', label=None):
+        return query_budget_context(self, max_queries, using=using, label=label)
+
+    def assertTimeBudget(self, seconds, label=None):
+        return time_budget_context(self, seconds, label=label)
+
+
+def query_budget(max_queries, using='default'):
+    """Decorate a test method so its whole body must stay within ``max_queries``"""
+    def decorator(test_method):
+        @functools.wraps(test_method)
+        def wrapper(self, *args, **kwargs):
+            with query_budget_context(self, max_queries, using=using, label=test_method.__name__):
+                return test_method(self, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def time_budget(seconds):
+    """Decorate a test method so its whole body must finish within ``seconds``"""
+    def decorator(test_method):
+        @functools.wraps(test_method)
+        def wrapper(self, *args, **kwargs):
+            with time_budget_context(self, seconds, label=test_method.__name__):
+                return test_method(self, *args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,62 @@
+"""
+Database router sending reads to the replica alias named by the
+DATABASE_READ_REPLICA setting, when it is set.
+
+Writes always go to the primary (``default``). Once a write happened, the
+rest of the request reads from the primary too, and ReplicaPinningMiddleware
+keeps the client on the primary for DATABASE_REPLICA_PIN_SECONDS afterwards
+so it reads its own writes despite replication lag.
+"""
+from contextvars import ContextVar
+
+from django.conf import settings
+
+PRIMARY = 'default'
+
+_pinned_to_primary = ContextVar('pinned_to_primary', default=False)
+_wrote_to_primary = ContextVar('wrote_to_primary', default=False)
+
+
+def pin_to_primary():
+    """Send the remaining reads of the current request/context to the primary"""
+    return _pinned_to_primary.set(True)
+
+
+def is_pinned_to_primary():
+    return _pinned_to_primary.get()
+
+
+def wrote_to_primary():
+    return _wrote_to_primary.get()
+
+
+def start_request(pinned):
+    """Reset the routing state for a new request, returns tokens for end_request()"""
+    return _pinned_to_primary.set(pinned), _wrote_to_primary.set(False)
+
+
+def end_request(tokens):
+    pinned_token, wrote_token = tokens
+    _pinned_to_primary.reset(pinned_token)
+    _wrote_to_primary.reset(wrote_token)
+
+
+class PrimaryReplicaRouter:
+    def db_for_read(self, model, **hints):
+        replica = settings.DATABASE_READ_REPLICA
+        if not replica or _pinned_to_primary.get():
+            return PRIMARY
+        return replica
+
+    def db_for_write(self, model, **hints):
+        _pinned_to_primary.set(True)
+        _wrote_to_primary.set(True)
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Both aliases hold the same data
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # The replica gets its schema through replication
+        return db == PRIMARY
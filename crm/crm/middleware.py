@@ -0,0 +1,254 @@
+import zlib
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.core.handlers.exception import convert_exception_to_response
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+from django.utils.module_loading import import_string
+
+from . import db_routers
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+def _accepted_encodings(header):
+    """Map each encoding in an Accept-Encoding header to its q-value"""
+    accepted = {}
+    for item in header.split(','):
+        encoding, _, params = item.strip().partition(';')
+        encoding = encoding.strip().lower()
+        if not encoding:
+            continue
+        quality = 1.0
+        for param in params.split(';'):
+            name, _, value = param.strip().partition('=')
+            if name == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        accepted[encoding] = quality
+    return accepted
+
+
+class _GzipCompressor:
+    def __init__(self, level):
+        # wbits 31 writes a gzip header and trailer
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def process(self, chunk):
+        return self._compressor.compress(chunk)
+
+    def flush(self):
+        return self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self):
+        return self._compressor.flush(zlib.Z_FINISH)
+
+
+class _BrotliCompressor:
+    def __init__(self, quality):
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def process(self, chunk):
+        return self._compressor.process(chunk)
+
+    def flush(self):
+        return self._compressor.flush()
+
+    def finish(self):
+        return self._compressor.finish()
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    """
+    Compress API responses with brotli or gzip, whichever the client
+    prefers (brotli wins ties and is only offered when installed).
+
+    Only paths under COMPRESSION_PATH_PREFIXES are compressed, responses
+    smaller than COMPRESSION_MIN_SIZE bytes are sent as-is, and streaming
+    responses are compressed chunk by chunk. Static files are left to
+    WhiteNoise, which serves them precompressed.
+    """
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        self.min_size = settings.COMPRESSION_MIN_SIZE
+        self.path_prefixes = tuple(settings.COMPRESSION_PATH_PREFIXES)
+        self.gzip_level = settings.COMPRESSION_GZIP_LEVEL
+        self.brotli_quality = settings.COMPRESSION_BROTLI_QUALITY
+
+    def select_encoding(self, request):
+        accepted = _accepted_encodings(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        wildcard = accepted.get('*', 0.0)
+        candidates = ['br', 'gzip'] if brotli is not None else ['gzip']
+        best, best_quality = None, 0.0
+        for encoding in candidates:
+            quality = accepted.get(encoding, wildcard)
+            if quality > best_quality:
+                best, best_quality = encoding, quality
+        return best
+
+    def compressor(self, encoding):
+        if encoding == 'br':
+            return _BrotliCompressor(self.brotli_quality)
+        return _GzipCompressor(self.gzip_level)
+
+    def compress(self, encoding, content):
+        compressor = self.compressor(encoding)
+        return compressor.process(content) + compressor.finish()
+
+    def compress_stream(self, encoding, iterator):
+        compressor = self.compressor(encoding)
+        for chunk in iterator:
+            data = compressor.process(chunk)
+            # Flush so every chunk reaches the client without waiting for the end
+            data += compressor.flush()
+            if data:
+                yield data
+        yield compressor.finish()
+
+    async def compress_async_stream(self, encoding, iterator):
+        compressor = self.compressor(encoding)
+        async for chunk in iterator:
+            data = compressor.process(chunk) + compressor.flush()
+            if data:
+                yield data
+        yield compressor.finish()
+
+    def process_response(self, request, response):
+        if not request.path.startswith(self.path_prefixes):
+            return response
+        if response.has_header('Content-Encoding'):
+            return response
+        if not response.streaming and len(response.content) < self.min_size:
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encoding = self.select_encoding(request)
+        if encoding is None:
+            return response
+
+        if response.streaming:
+            if response.is_async:
+                response.streaming_content = self.compress_async_stream(
+                    encoding, response.streaming_content
+                )
+            else:
+                response.streaming_content = self.compress_stream(
+                    encoding, response.streaming_content
+                )
+            # The compressed size isn't known until the stream ends
+            del response.headers['Content-Length']
+        else:
+            compressed = self.compress(encoding, response.content)
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response.headers['Content-Length'] = str(len(compressed))
+
+        # The body changed, so a strong ETag has to become weak (RFC 9110 8.8.1)
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response.headers['ETag'] = 'W/' + etag
+        response.headers['Content-Encoding'] = encoding
+        return response
+
+
+class ReplicaPinningMiddleware:
+    """
+    Keep reads on the primary database when they could observe a write:
+    during unsafe requests, for the rest of a request that wrote, and for
+    DATABASE_REPLICA_PIN_SECONDS after a write (tracked with a cookie).
+    """
+    cookie_name = 'crm_db_primary'
+    safe_methods = ('GET', 'HEAD', 'OPTIONS', 'TRACE')
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.pin_seconds = settings.DATABASE_REPLICA_PIN_SECONDS
+
+    def __call__(self, request):
+        pinned = request.method not in self.safe_methods or self.cookie_name in request.COOKIES
+        tokens = db_routers.start_request(pinned)
+        try:
+            response = self.get_response(request)
+            if db_routers.wrote_to_primary() and self.pin_seconds:
+                response.set_cookie(
+                    self.cookie_name, '1', max_age=self.pin_seconds,
+                    httponly=True, samesite='Lax',
+                )
+            return response
+        finally:
+            db_routers.end_request(tokens)
+
+
+class NonAPIMiddleware:
+    """
+    Run the NON_API_MIDDLEWARE stack (sessions, CSRF, messages, ...) for
+    every path outside API_PATH_PREFIX; API requests skip it entirely.
+
+    The wrapped middleware keep their process_view, process_exception and
+    process_template_response hooks, called in the order Django would.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.api_prefix = settings.API_PATH_PREFIX
+
+        middleware = []
+        handler = get_response
+        for middleware_path in reversed(settings.NON_API_MIDDLEWARE):
+            try:
+                instance = import_string(middleware_path)(handler)
+            except MiddlewareNotUsed:
+                continue
+            middleware.insert(0, instance)
+            handler = convert_exception_to_response(instance)
+        self.chain = handler
+
+        self.view_hooks = [m.process_view for m in middleware if hasattr(m, 'process_view')]
+        self.template_response_hooks = [
+            m.process_template_response for m in reversed(middleware)
+            if hasattr(m, 'process_template_response')
+        ]
+        self.exception_hooks = [
+            m.process_exception for m in reversed(middleware)
+            if hasattr(m, 'process_exception')
+        ]
+
+    def is_api(self, request):
+        return request.path_info.startswith(self.api_prefix)
+
+    def __call__(self, request):
+        if self.is_api(request):
+            return self.get_response(request)
+        return self.chain(request)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if self.is_api(request):
+            return None
+        for hook in self.view_hooks:
+            response = hook(request, view_func, view_args, view_kwargs)
+            if response is not None:
+                return response
+        return None
+
+    def process_template_response(self, request, response):
+        if not self.is_api(request):
+            for hook in self.template_response_hooks:
+                response = hook(request, response)
+        return response
+
+    def process_exception(self, request, exception):
+        if self.is_api(request):
+            return None
+        for hook in self.exception_hooks:
+            response = hook(request, exception)
+            if response is not None:
+                return response
+        return None
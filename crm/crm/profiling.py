@@ -0,0 +1,222 @@
+"""
+On-demand profiling of single requests.
+
+A request is profiled when it carries an ``X-Profile`` header with a token
+from make_profile_token() (valid for PROFILING_TOKEN_MAX_AGE seconds), or a
+``?_profile=1`` query flag and comes from a staff user:
+
+    python manage.py shell -c "from crm.profiling import make_profile_token; print(make_profile_token())"
+
+The view runs under cProfile with every SQL query and its time captured.
+The profile is written to an on-disk ring buffer of PROFILING_MAX_ENTRIES
+files, its id is returned in the ``X-Profile-Id`` response header and staff
+can read it back from /api/debug/profiles/<id>/. Requests without the
+header or flag only pay for two dictionary lookups.
+"""
+import cProfile
+import io
+import json
+import os
+import pstats
+import re
+import time
+import uuid
+from contextlib import ExitStack
+from pathlib import Path
+
+from django.conf import settings
+from django.core import signing
+from django.core.signals import request_started
+from django.db import connections, reset_queries
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+
+PROFILE_HEADER = 'HTTP_X_PROFILE'
+QUERY_FLAG = '_profile'
+SIGNING_SALT = 'crm.profiling'
+
+_PROFILE_ID_RE = re.compile(r'^\d+-[0-9a-f]{32}$')
+
+
+def make_profile_token():
+    """Signed token enabling profiling through the X-Profile header"""
+    return signing.TimestampSigner(salt=SIGNING_SALT).sign('profile')
+
+
+def _valid_token(token):
+    try:
+        signing.TimestampSigner(salt=SIGNING_SALT).unsign(token, max_age=settings.PROFILING_TOKEN_MAX_AGE)
+    except signing.BadSignature:
+        return False
+    return True
+
+
+class LazyCaptureQueriesContext(CaptureQueriesContext):
+    """
+    CaptureQueriesContext that doesn't connect on enter. Aliases the request
+    never uses stay closed (an unreachable replica can't fail the request),
+    and a connection opened during the request is still captured, including
+    its connection setup queries.
+    """
+
+    def __enter__(self):
+        self.force_debug_cursor = self.connection.force_debug_cursor
+        self.connection.force_debug_cursor = True
+        self.initial_queries = len(self.connection.queries_log)
+        self.final_queries = None
+        request_started.disconnect(reset_queries)
+        return self
+
+
+class ProfileStore:
+    """Bounded on-disk ring buffer of profiles, one JSON file each"""
+
+    def __init__(self, directory=None, max_entries=None):
+        self.directory = Path(directory or settings.PROFILING_DIR)
+        self.max_entries = max_entries or settings.PROFILING_MAX_ENTRIES
+
+    def save(self, profile):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        # Time first, so file names sort oldest first
+        profile_id = f'{time.time_ns()}-{uuid.uuid4().hex}'
+        tmp = self.directory / f'.{profile_id}.tmp'
+        tmp.write_text(json.dumps(dict(profile, id=profile_id), default=str))
+        os.replace(tmp, self.directory / f'{profile_id}.json')
+        self.prune()
+        return profile_id
+
+    def ids(self):
+        if not self.directory.exists():
+            return []
+        return sorted(path.stem for path in self.directory.glob('*.json'))
+
+    def prune(self):
+        for profile_id in self.ids()[:-self.max_entries]:
+            try:
+                (self.directory / f'{profile_id}.json').unlink()
+            except FileNotFoundError:
+                # Another worker pruned it first
+                pass
+
+    def get(self, profile_id):
+        if not _PROFILE_ID_RE.match(profile_id):
+            return None
+        try:
+            return json.loads((self.directory / f'{profile_id}.json').read_text())
+        except FileNotFoundError:
+            return None
+
+    def summaries(self):
+        """Newest first, without the stats and queries"""
+        summaries = []
+        for profile_id in reversed(self.ids()):
+            profile = self.get(profile_id)
+            if profile is not None:
+                summaries.append({
+                    key: profile.get(key)
+                    for key in ('id', 'created_at', 'method', 'path', 'status_code', 'duration_ms', 'query_count')
+                })
+        return summaries
+
+
+class ProfilingMiddleware:
+    """
+    Profile the rest of the middleware chain and the view when requested.
+    Placed last in MIDDLEWARE so request.user is available for admin pages.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if PROFILE_HEADER not in request.META and QUERY_FLAG not in request.GET:
+            return self.get_response(request)
+        if not self.allowed(request):
+            return self.get_response(request)
+        return self.profile(request)
+
+    def allowed(self, request):
+        token = request.META.get(PROFILE_HEADER)
+        if token is not None:
+            return _valid_token(token)
+        return self.is_staff(request)
+
+    def is_staff(self, request):
+        user = getattr(request, 'user', None)
+        if user is not None and user.is_authenticated:
+            return user.is_staff
+        # API requests authenticate with a JWT inside the view, check it here
+        try:
+            authenticated = JWTAuthentication().authenticate(request)
+        except (AuthenticationFailed, InvalidToken, TokenError):
+            return False
+        return authenticated is not None and authenticated[0].is_staff
+
+    def profile(self, request):
+        profiler = cProfile.Profile()
+        with ExitStack() as stack:
+            captured = {
+                alias: stack.enter_context(LazyCaptureQueriesContext(connections[alias]))
+                for alias in connections
+            }
+            started = time.perf_counter()
+            profiler.enable()
+            try:
+                response = self.get_response(request)
+            finally:
+                profiler.disable()
+            duration = time.perf_counter() - started
+
+        stats = io.StringIO()
+        pstats.Stats(profiler, stream=stats).sort_stats('cumulative').print_stats(settings.PROFILING_TOP_FUNCTIONS)
+        queries = [
+            {'alias': alias, 'sql': query['sql'], 'time': query['time']}
+            for alias, context in captured.items()
+            for query in context.captured_queries
+        ]
+
+        profile_id = ProfileStore().save({
+            'created_at': timezone.now().isoformat(),
+            'method': request.method,
+            'path': request.get_full_path(),
+            'status_code': response.status_code,
+            'duration_ms': round(duration * 1000, 3),
+            'query_count': len(queries),
+            'query_time_ms': round(sum(float(query['time']) for query in queries) * 1000, 3),
+            'queries': queries,
+            'stats': stats.getvalue(),
+        })
+        response['X-Profile-Id'] = profile_id
+        return response
+
+
+class ProfileListView(APIView):
+    """
+    API to list the stored request profiles, newest first (staff only).
+    GET /api/debug/profiles/
+    """
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return Response(ProfileStore().summaries())
+
+
+class ProfileDetailView(APIView):
+    """
+    API to get one stored request profile with its SQL and cProfile stats (staff only).
+    GET /api/debug/profiles/<id>/
+    """
+    permission_classes = [IsAdminUser]
+
+    def get(self, request, profile_id):
+        profile = ProfileStore().get(profile_id)
+        if profile is None:
+            return Response({'detail': 'Profile not found'}, status=status.HTTP_404_NOT_FOUND)
+        return Response(profile)
@@ -0,0 +1,62 @@
+"""
+Renderers backed by faster encoders than the standard library json module.
+
+FastJSONRenderer uses orjson when it is installed and falls back to DRF's
+JSONRenderer otherwise. MessagePackRenderer needs the msgpack package and
+is only enabled in settings when it is available.
+"""
+from rest_framework import renderers
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+
+# DRF's encoder knows how to turn querysets, lazy strings, Decimals, etc.
+# into JSON types, both encoders below use it for types they don't support
+_drf_encoder = JSONEncoder()
+
+
+def encode_default(obj):
+    return _drf_encoder.default(obj)
+
+
+class FastJSONRenderer(renderers.JSONRenderer):
+    """
+    Drop-in replacement for JSONRenderer using orjson, which encodes
+    datetimes and UUIDs natively.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None:
+            return super().render(data, accepted_media_type, renderer_context)
+        if data is None:
+            return b''
+
+        option = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+        if self.get_indent(accepted_media_type, renderer_context or {}):
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(data, default=encode_default, option=option)
+
+
+class MessagePackRenderer(renderers.BaseRenderer):
+    """
+    Renders MessagePack for clients sending ``Accept: application/msgpack``.
+    Datetimes, UUIDs and Decimals are encoded as in the JSON responses.
+    """
+    media_type = 'application/msgpack'
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return msgpack.packb(data, default=encode_default, use_bin_type=True)
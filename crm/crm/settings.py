@@ -11,11 +11,14 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
 from pathlib import Path
-from decouple import config
+from decouple import Choices, config
 
 from datetime import timedelta
+from importlib.util import find_spec
 from dotenv import load_dotenv
 import os
+import re
+import warnings
 load_dotenv()
 
 
@@ -68,6 +71,14 @@ CORS_ALLOW_HEADERS = [
     'user-agent',
     'x-csrftoken',
     'x-requested-with',
+    'x-profile',
+    'idempotency-key',
+]
+
+# Response headers browser clients may read
+CORS_EXPOSE_HEADERS = [
+    'idempotent-replayed',
+    'x-profile-id',
 ]
 
 CORS_ALLOW_METHODS = [
@@ -79,16 +90,22 @@ CORS_ALLOW_METHODS = [
     'PUT',
 ]
 
+# CorsMiddleware comes first so preflight requests are answered before any
+# other middleware can respond. crm/settings_api.py has a trimmed stack for
+# pure API deployments.
 MIDDLEWARE = [
+    'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'whitenoise.middleware.WhiteNoiseMiddleware',
+    'crm.middleware.CompressionMiddleware',
+    'crm.middleware.ReplicaPinningMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
-     'corsheaders.middleware.CorsMiddleware',
-    'django.middleware.common.CommonMiddleware',
+    'crm.profiling.ProfilingMiddleware',
 ]
 
 ROOT_URLCONF = 'crm.urls'
@@ -122,13 +139,50 @@ DATABASES = {
         'PASSWORD': config('DB_PASSWORD'),
         'HOST': config('DB_HOST'),
         'PORT': config('DB_PORT'),
+        # Keep connections open between requests so workers don't reconnect
+        # (and lose their warmed-up connection) on every request
+        'CONN_MAX_AGE': config('DB_CONN_MAX_AGE', default=60, cast=int),
+        'CONN_HEALTH_CHECKS': True,
     }
 }
+
+# Optional read replica, enabled by setting DB_REPLICA_HOST. Safe reads go to
+# the replica, writes and reads following a write go to 'default' (see
+# crm/db_routers.py). To try it locally point DB_REPLICA_* at a second local
+# PostgreSQL instance, or at the primary itself.
+DB_REPLICA_HOST = config('DB_REPLICA_HOST', default='')
+
+if DB_REPLICA_HOST:
+    DATABASES['replica'] = {
+        'ENGINE': 'django.db.backends.postgresql',
+        'NAME': config('DB_REPLICA_NAME', default=DATABASES['default']['NAME']),
+        'USER': config('DB_REPLICA_USER', default=DATABASES['default']['USER']),
+        'PASSWORD': config('DB_REPLICA_PASSWORD', default=DATABASES['default']['PASSWORD']),
+        'HOST': DB_REPLICA_HOST,
+        'PORT': config('DB_REPLICA_PORT', default=DATABASES['default']['PORT']),
+        'CONN_MAX_AGE': DATABASES['default']['CONN_MAX_AGE'],
+        'CONN_HEALTH_CHECKS': True,
+        'TEST': {'MIRROR': 'default'},
+    }
+
+DATABASE_READ_REPLICA = 'replica' if DB_REPLICA_HOST else None
+DATABASE_ROUTERS = ['crm.db_routers.PrimaryReplicaRouter']
+
+# Seconds a client keeps reading from the primary after a write
+DATABASE_REPLICA_PIN_SECONDS = config('DATABASE_REPLICA_PIN_SECONDS', default=5, cast=int)
+
 # Django REST Framework & JWT Authentication
+# JSON goes through orjson when installed, MessagePack is offered to clients
+# sending Accept: application/msgpack when the msgpack package is installed
 REST_FRAMEWORK = {
     'DEFAULT_RENDERER_CLASSES': [
-        'rest_framework.renderers.JSONRenderer',
-    ],
+        'crm.renderers.FastJSONRenderer',
+    ] + (['crm.renderers.MessagePackRenderer'] if find_spec('msgpack') else []),
+    'DEFAULT_PARSER_CLASSES': [
+        'crm.parsers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ] + (['crm.parsers.MessagePackParser'] if find_spec('msgpack') else []),
     'DEFAULT_AUTHENTICATION_CLASSES': [
         'rest_framework_simplejwt.authentication.JWTAuthentication',
     ],
@@ -145,6 +199,62 @@ SIMPLE_JWT = {
 
 
 
+# Cache
+# Per-process memory cache by default. Set REDIS_URL in deployments with
+# several workers so cache invalidation (e.g. of user profiles) reaches all
+# of them.
+REDIS_URL = config('REDIS_URL', default='')
+
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+# Seconds a user profile stays cached, saving the user invalidates it earlier
+PROFILE_CACHE_TIMEOUT = config('PROFILE_CACHE_TIMEOUT', default=3600, cast=int)
+
+
+# Password hashing
+# PASSWORD_HASHER picks the hasher for new passwords: 'pbkdf2' (Django's
+# default), 'argon2' (needs argon2-cffi) or 'scrypt'. Hashes made with
+# another hasher or other cost parameters are upgraded on the next login.
+PASSWORD_HASHER = config('PASSWORD_HASHER', default='pbkdf2')
+
+PASSWORD_PBKDF2_ITERATIONS = config('PASSWORD_PBKDF2_ITERATIONS', default=1_000_000, cast=int)
+PASSWORD_ARGON2_TIME_COST = config('PASSWORD_ARGON2_TIME_COST', default=2, cast=int)
+PASSWORD_ARGON2_MEMORY_COST = config('PASSWORD_ARGON2_MEMORY_COST', default=102400, cast=int)  # KiB
+PASSWORD_ARGON2_PARALLELISM = config('PASSWORD_ARGON2_PARALLELISM', default=8, cast=int)
+PASSWORD_SCRYPT_WORK_FACTOR = config('PASSWORD_SCRYPT_WORK_FACTOR', default=2 ** 14, cast=int)
+PASSWORD_SCRYPT_BLOCK_SIZE = config('PASSWORD_SCRYPT_BLOCK_SIZE', default=8, cast=int)
+PASSWORD_SCRYPT_PARALLELISM = config('PASSWORD_SCRYPT_PARALLELISM', default=5, cast=int)
+
+_PASSWORD_HASHERS_BY_NAME = {
+    'pbkdf2': 'user.hashers.TunedPBKDF2PasswordHasher',
+    'argon2': 'user.hashers.TunedArgon2PasswordHasher',
+    'scrypt': 'user.hashers.TunedScryptPasswordHasher',
+}
+# The preferred hasher first, the others stay listed so existing hashes still verify
+PASSWORD_HASHERS = [_PASSWORD_HASHERS_BY_NAME[PASSWORD_HASHER]] + [
+    hasher for name, hasher in _PASSWORD_HASHERS_BY_NAME.items() if name != PASSWORD_HASHER
+] + [
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+]
+
+# Seconds a successful login is remembered so repeated logins with the same
+# credentials skip the hasher, 0 disables the cache
+LOGIN_CACHE_TIMEOUT = config('LOGIN_CACHE_TIMEOUT', default=60, cast=int)
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -180,6 +290,34 @@ USE_TZ = True
 # https://docs.djangoproject.com/en/5.2/howto/static-files/
 
 STATIC_URL = 'static/'
+STATIC_ROOT = BASE_DIR / 'staticfiles'
+
+# WhiteNoise serves the collected files with far-future caching for the
+# hashed names and precompressed gzip/brotli variants. The manifest only
+# exists after collectstatic, so deployments that run it set
+# STATIC_MANIFEST=true and development keeps the plain storage.
+STATIC_MANIFEST = config('STATIC_MANIFEST', default=not DEBUG, cast=bool)
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': (
+            'whitenoise.storage.CompressedManifestStaticFilesStorage' if STATIC_MANIFEST
+            else 'django.contrib.staticfiles.storage.StaticFilesStorage'
+        ),
+    },
+}
+if not STATIC_MANIFEST:
+    # STATIC_ROOT only exists after collectstatic, don't let WhiteNoise warn
+    # about it on every start of runserver, the tests and the benchmarks
+    warnings.filterwarnings('ignore', message=f'No directory at: {re.escape(str(STATIC_ROOT))}')
+
+# API response compression (crm.middleware.CompressionMiddleware)
+COMPRESSION_PATH_PREFIXES = ['/api/']
+COMPRESSION_MIN_SIZE = config('COMPRESSION_MIN_SIZE', default=1024, cast=int)  # bytes
+COMPRESSION_GZIP_LEVEL = config('COMPRESSION_GZIP_LEVEL', default=6, cast=int)
+COMPRESSION_BROTLI_QUALITY = config('COMPRESSION_BROTLI_QUALITY', default=4, cast=int)
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
@@ -189,3 +327,41 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 # Custom user model
 AUTH_USER_MODEL = 'user.Employee'
+
+
+# Ticket SLA: minutes until a ticket of each priority is due (see ticket/sla.py)
+TICKET_SLA_MINUTES = {
+    'low': 72 * 60,
+    'medium': 24 * 60,
+    'high': 4 * 60,
+    'urgent': 60,
+}
+# Email of the employee receiving overdue urgent tickets, empty to just stop the timer
+TICKET_SLA_ESCALATION_OWNER = config('TICKET_SLA_ESCALATION_OWNER', default='')
+
+# Duplicate ticket detection on create (see ticket/dedup.py). A new ticket is
+# a duplicate of an open ticket created in the last WINDOW_MINUTES with the
+# same fingerprint and at least THRESHOLD estimated text similarity. ACTION
+# 'link' creates it with duplicate_of set, 'reject' answers 409 instead.
+TICKET_DEDUP = {
+    'ENABLED': config('TICKET_DEDUP_ENABLED', default=True, cast=bool),
+    'WINDOW_MINUTES': config('TICKET_DEDUP_WINDOW_MINUTES', default=24 * 60, cast=int),
+    'THRESHOLD': config('TICKET_DEDUP_THRESHOLD', default=0.8, cast=float),
+    'ACTION': config('TICKET_DEDUP_ACTION', default='link', cast=Choices(['link', 'reject'])),
+}
+
+# Most tickets returned by one batch fetch (GET /api/tickets/?ids=...)
+TICKET_BATCH_MAX_IDS = config('TICKET_BATCH_MAX_IDS', default=100, cast=int)
+
+# Admin changelists use the planner's row estimate instead of COUNT(*) above
+# this many rows (PostgreSQL only, see crm/paginators.py)
+ADMIN_ESTIMATED_COUNT_THRESHOLD = config('ADMIN_ESTIMATED_COUNT_THRESHOLD', default=10000, cast=int)
+
+# Hours a ticket create Idempotency-Key is remembered (see ticket/idempotency.py)
+IDEMPOTENCY_KEY_TTL_HOURS = config('IDEMPOTENCY_KEY_TTL_HOURS', default=24, cast=int)
+
+# On-demand request profiling (see crm/profiling.py)
+PROFILING_DIR = config('PROFILING_DIR', default=str(BASE_DIR / 'profiles'))
+PROFILING_MAX_ENTRIES = config('PROFILING_MAX_ENTRIES', default=50, cast=int)
+PROFILING_TOKEN_MAX_AGE = config('PROFILING_TOKEN_MAX_AGE', default=600, cast=int)  # seconds
+PROFILING_TOP_FUNCTIONS = 60
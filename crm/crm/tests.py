@@ -0,0 +1,167 @@
+import tempfile
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.db import OperationalError, connections
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from crm import db_routers, settings_api, warmup
+from crm.middleware import ReplicaPinningMiddleware
+from crm.profiling import LazyCaptureQueriesContext, ProfileStore, make_profile_token
+
+User = get_user_model()
+
+@override_settings(DATABASE_READ_REPLICA='replica', DATABASE_REPLICA_PIN_SECONDS=5)
+class PrimaryReplicaRouterTest(SimpleTestCase):
+    def setUp(self):
+        self.router = db_routers.PrimaryReplicaRouter()
+        self.factory = RequestFactory()
+        self.reads = []
+
+    def view(self, write=False):
+        def get_response(request):
+            if write:
+                self.router.db_for_write(None)
+            self.reads.append(self.router.db_for_read(None))
+            return HttpResponse()
+        return ReplicaPinningMiddleware(get_response)
+
+    def test_safe_reads_go_to_replica(self):
+        response = self.view()(self.factory.get('/api/tickets/list/'))
+        self.assertEqual(self.reads, ['replica'])
+        self.assertNotIn(ReplicaPinningMiddleware.cookie_name, response.cookies)
+
+    def test_writes_pin_the_client_to_primary(self):
+        response = self.view(write=True)(self.factory.post('/api/tickets/create/'))
+        self.assertEqual(self.reads, ['default'])
+        cookie = response.cookies[ReplicaPinningMiddleware.cookie_name]
+        self.assertEqual(cookie['max-age'], 5)
+
+        request = self.factory.get('/api/tickets/list/')
+        request.COOKIES[ReplicaPinningMiddleware.cookie_name] = '1'
+        self.view()(request)
+        self.assertEqual(self.reads, ['default', 'default'])
+
+    def test_state_does_not_leak_between_requests(self):
+        self.view(write=True)(self.factory.post('/api/tickets/create/'))
+        self.view()(self.factory.get('/api/tickets/list/'))
+        self.assertEqual(self.reads, ['default', 'replica'])
+
+    @override_settings(DATABASE_READ_REPLICA=None)
+    def test_without_replica_everything_uses_default(self):
+        self.view()(self.factory.get('/api/tickets/list/'))
+        self.assertEqual(self.reads, ['default'])
+
+
+@override_settings(
+    MIDDLEWARE=settings_api.MIDDLEWARE,
+    NON_API_MIDDLEWARE=settings_api.NON_API_MIDDLEWARE,
+    API_PATH_PREFIX=settings_api.API_PATH_PREFIX,
+)
+class APIMiddlewareProfileTest(TestCase):
+    def test_api_requests_skip_the_site_middleware(self):
+        response = self.client.get('/api/tickets/list/')
+        self.assertEqual(response.status_code, 401)
+        self.assertFalse(response.has_header('X-Frame-Options'))
+        self.assertNotIn('csrftoken', response.cookies)
+
+    def test_admin_keeps_sessions_and_csrf(self):
+        response = self.client.get('/admin/login/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['X-Frame-Options'], 'DENY')
+        self.assertIn('csrftoken', response.cookies)
+
+        # CSRF is still enforced through the wrapped process_view hook
+        self.client.handler.enforce_csrf_checks = True
+        response = self.client.post('/admin/login/', {'username': 'x', 'password': 'y'})
+        self.assertEqual(response.status_code, 403)
+
+    def test_cors_preflight_is_answered_first(self):
+        response = self.client.options(
+            '/api/tickets/list/',
+            HTTP_ORIGIN='http://localhost:3000',
+            HTTP_ACCESS_CONTROL_REQUEST_METHOD='GET',
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Access-Control-Allow-Origin'], 'http://localhost:3000')
+
+
+class ProfilingTest(APITestCase):
+    def setUp(self):
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        settings_override = override_settings(PROFILING_DIR=tmpdir.name, PROFILING_MAX_ENTRIES=2)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.staff = User.objects.create_user(
+            username='staff', email='staff@example.com', password='testpass123', is_staff=True
+        )
+        self.user = User.objects.create_user(
+            username='plain', email='plain@example.com', password='testpass123'
+        )
+        self.url = reverse('ticket:ticket-list')
+
+    def test_requests_are_not_profiled_by_default(self):
+        self.client.force_authenticate(user=self.user)
+        response = self.client.get(self.url)
+        self.assertFalse(response.has_header('X-Profile-Id'))
+        self.assertEqual(ProfileStore().ids(), [])
+
+    def test_signed_header_stores_a_profile(self):
+        self.client.force_authenticate(user=self.user)
+        response = self.client.get(self.url, HTTP_X_PROFILE=make_profile_token())
+        profile_id = response['X-Profile-Id']
+
+        self.client.force_authenticate(user=self.staff)
+        profile = self.client.get(reverse('profile-detail', args=[profile_id])).data
+        self.assertEqual(profile['path'], self.url)
+        self.assertEqual(profile['query_count'], len(profile['queries']))
+        self.assertIn('cumulative', profile['stats'])
+
+    def test_query_flag_needs_a_staff_user(self):
+        self.client.force_authenticate(user=self.user)
+        response = self.client.get(self.url, {'_profile': '1'})
+        self.assertFalse(response.has_header('X-Profile-Id'))
+        response = self.client.get(self.url, HTTP_X_PROFILE='forged')
+        self.assertFalse(response.has_header('X-Profile-Id'))
+
+        self.client.force_authenticate(user=None)
+        self.client.login(username='staff', password='testpass123')
+        response = self.client.get('/admin/', {'_profile': '1'})
+        self.assertTrue(response.has_header('X-Profile-Id'))
+
+    def test_ring_buffer_keeps_the_newest_profiles(self):
+        self.client.force_authenticate(user=self.staff)
+        ids = [
+            self.client.get(self.url, HTTP_X_PROFILE=make_profile_token())['X-Profile-Id']
+            for _ in range(3)
+        ]
+        listed = self.client.get(reverse('profile-list')).data
+        self.assertEqual([profile['id'] for profile in listed], ids[:0:-1])
+
+    def test_unused_connections_are_not_opened(self):
+        replica = mock.Mock(queries_log=[], force_debug_cursor=False)
+        replica.ensure_connection.side_effect = OperationalError('replica down')
+        with LazyCaptureQueriesContext(replica) as captured:
+            pass
+        replica.ensure_connection.assert_not_called()
+        self.assertEqual(captured.final_queries, 0)
+        self.assertFalse(replica.force_debug_cursor)
+
+    def test_profiles_are_staff_only(self):
+        self.client.force_authenticate(user=self.user)
+        response = self.client.get(reverse('profile-list'))
+        self.assertEqual(response.status_code, 403)
+
+
+class WarmUpTest(SimpleTestCase):
+    def test_unreachable_database_does_not_fail_the_warm_up(self):
+        with mock.patch.object(
+            type(connections['default']), 'ensure_connection', side_effect=OperationalError('down')
+        ), self.assertLogs('crm.warmup', 'WARNING'):
+            timings = warmup.warm_up(connect=True)
+        self.assertIn('open_connections', timings)
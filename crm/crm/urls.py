@@ -17,8 +17,13 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import path, include
 
+from .profiling import ProfileDetailView, ProfileListView
+
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/auth/', include('user.urls')),
     path('api/tickets/', include('ticket.urls')),  # Include ticket app URLs
+    # Stored request profiles (staff only), see crm/profiling.py
+    path('api/debug/profiles/', ProfileListView.as_view(), name='profile-list'),
+    path('api/debug/profiles/<str:profile_id>/', ProfileDetailView.as_view(), name='profile-detail'),
 ]
@@ -0,0 +1,104 @@
+"""
+Warm-up of a freshly started process before it accepts traffic.
+
+Imports the views, builds the serializers' fields, resolves every route
+and opens the database connections, so the first real request doesn't pay
+for them. Called from the gunicorn hooks in gunicorn.conf.py.
+"""
+import logging
+import re
+import time
+from importlib import import_module
+
+from django.db import DatabaseError, connections
+from django.urls import Resolver404, URLPattern, URLResolver, get_resolver
+
+VIEW_MODULES = ['ticket.views', 'user.views']
+
+SERIALIZERS = [
+    'ticket.serializers.TicketSerializer',
+    'user.serializers.RegisterSerializer',
+    'user.serializers.LoginSerializer',
+    'user.serializers.UserListSerializer',
+]
+
+# Sample values used to turn route patterns into resolvable paths
+_CONVERTER_SAMPLES = {'int': '1', 'path': 'x', 'slug': 'x', 'str': 'x', 'uuid': '00000000-0000-0000-0000-000000000000'}
+_CONVERTER_RE = re.compile(r'<(?:(?P<converter>[^>:]+):)?(?P<name>[^>]+)>')
+
+logger = logging.getLogger(__name__)
+
+
+def _sample_paths(patterns, prefix=''):
+    """Yield a concrete path for every route built with path()"""
+    for pattern in patterns:
+        route = getattr(pattern.pattern, '_route', None)
+        if route is None:
+            # re_path() patterns can't be turned into a path, reverse_dict still compiles them
+            continue
+        path = prefix + _CONVERTER_RE.sub(
+            lambda m: _CONVERTER_SAMPLES.get(m.group('converter') or 'str', 'x'), route
+        )
+        if isinstance(pattern, URLResolver):
+            yield from _sample_paths(pattern.url_patterns, path)
+        elif isinstance(pattern, URLPattern):
+            yield '/' + path
+
+
+def import_views():
+    for module in VIEW_MODULES:
+        import_module(module)
+
+
+def build_serializers():
+    for dotted_path in SERIALIZERS:
+        module, name = dotted_path.rsplit('.', 1)
+        serializer_class = getattr(import_module(module), name)
+        # Field construction hits the model _meta caches and validator setup
+        serializer_class().fields
+
+
+def resolve_routes():
+    resolver = get_resolver()
+    resolver.reverse_dict  # compiles every pattern
+    resolved = 0
+    for path in _sample_paths(resolver.url_patterns):
+        try:
+            resolver.resolve(path)
+            resolved += 1
+        except Resolver404:
+            pass
+    return resolved
+
+
+def open_connections():
+    # An unreachable database must not keep the worker from booting, requests
+    # reconnect on their own once it is back
+    for alias in connections:
+        try:
+            connections[alias].ensure_connection()
+        except DatabaseError as e:
+            logger.warning(f"Warm-up could not connect to database {alias!r}: {e}")
+
+
+def warm_up(connect=True):
+    """
+    Run the warm-up steps and return the seconds spent in each.
+
+    Pass connect=False in a process that forks afterwards (gunicorn's master
+    with preload_app), database connections must not be shared with workers.
+    """
+    steps = [
+        ('import_views', import_views),
+        ('build_serializers', build_serializers),
+        ('resolve_routes', resolve_routes),
+    ]
+    if connect:
+        steps.append(('open_connections', open_connections))
+
+    timings = {}
+    for name, step in steps:
+        started = time.perf_counter()
+        step()
+        timings[name] = time.perf_counter() - started
+    return timings
@@ -0,0 +1,54 @@
+"""
+Gunicorn configuration, picked up automatically when gunicorn is started
+from this directory:
+
+    gunicorn crm.wsgi
+
+Every worker warms up (crm/warmup.py) before it accepts requests. With
+GUNICORN_PRELOAD (default on) Django is loaded and warmed once in the master
+and the workers fork from it, only the database connections are opened per
+worker.
+"""
+import multiprocessing
+import os
+
+
+def _env_flag(name, default):
+    return os.environ.get(name, default).lower() in ('1', 'true', 'yes', 'on')
+
+
+wsgi_app = 'crm.wsgi:application'
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:8000')
+workers = int(os.environ.get('GUNICORN_WORKERS', multiprocessing.cpu_count() * 2 + 1))
+threads = int(os.environ.get('GUNICORN_THREADS', 1))
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 30))
+keepalive = int(os.environ.get('GUNICORN_KEEPALIVE', 5))
+# Recycle workers now and then to contain memory growth, with jitter so they don't restart together
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 1000))
+max_requests_jitter = int(os.environ.get('GUNICORN_MAX_REQUESTS_JITTER', 100))
+preload_app = _env_flag('GUNICORN_PRELOAD', 'true')
+accesslog = os.environ.get('GUNICORN_ACCESSLOG', '-')
+
+
+def _log_timings(log, prefix, timings):
+    summary = ', '.join(f'{name} {seconds * 1000:.1f} ms' for name, seconds in timings.items())
+    log.info(f'{prefix} warm-up: {summary}')
+
+
+def _warm_up(log, prefix, connect):
+    # Warm-up is an optimization, a failure must never stop the server from booting
+    try:
+        from crm.warmup import warm_up
+        _log_timings(log, prefix, warm_up(connect=connect))
+    except Exception:
+        log.exception(f'{prefix} warm-up failed, continuing without it')
+
+
+def when_ready(server):
+    if preload_app:
+        # No connections in the master, the forked workers would share them
+        _warm_up(server.log, 'Master', connect=False)
+
+
+def post_worker_init(worker):
+    _warm_up(worker.log, f'Worker {worker.pid}', connect=True)
@@ -1,5 +1,134 @@
-from django.contrib import admin
+from django import forms
+from django.conf import settings
+from django.contrib import admin, messages
+from django.contrib.admin.helpers import ActionForm
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from django.db.models import Case, DateTimeField, F, Value, When
+from django.utils import timezone
 
-# Register your models here.
-from .models import Ticket
-admin.site.register(Ticket)
+from crm.paginators import EstimatedCountPaginator
+
+from .models import CLOSED_STATUSES, Ticket, is_closed
+from .sla import PRIORITY_LADDER, compute_due_at
+
+User = get_user_model()
+
+TICKET_STATUSES = ['new', 'open', 'pending', 'resolved', 'closed']
+
+
+class FixedValuesListFilter(admin.SimpleListFilter):
+    """
+    Filter on a fixed list of values. The default filter for a CharField
+    without choices runs SELECT DISTINCT over the whole table to build its
+    options.
+    """
+    values = ()
+
+    def lookups(self, request, model_admin):
+        return [(value, value.replace('_', ' ').capitalize()) for value in self.values]
+
+    def queryset(self, request, queryset):
+        if self.value():
+            return queryset.filter(**{self.parameter_name: self.value()})
+        return queryset
+
+
+class StatusListFilter(FixedValuesListFilter):
+    title = 'status'
+    parameter_name = 'status'
+    values = TICKET_STATUSES
+
+
+class PriorityListFilter(FixedValuesListFilter):
+    title = 'priority'
+    parameter_name = 'priority'
+    values = PRIORITY_LADDER
+
+
+class TicketActionForm(ActionForm):
+    """Action form with the target value for the bulk update actions"""
+    status = forms.ChoiceField(choices=[('', '---------')] + [(s, s) for s in TICKET_STATUSES], required=False)
+    priority = forms.ChoiceField(choices=[('', '---------')] + [(p, p) for p in PRIORITY_LADDER], required=False)
+    owner_id = forms.IntegerField(required=False, min_value=1, label='Owner ID')
+
+
+@admin.register(Ticket)
+class TicketAdmin(admin.ModelAdmin):
+    list_display = ('id', 'name', 'status', 'priority', 'owner', 'source', 'due_at', 'created_at')
+    list_select_related = ('owner',)
+    list_filter = (StatusListFilter, PriorityListFilter, ('created_at', admin.DateFieldListFilter))
+    search_fields = ('=id',)
+    ordering = ('-created_at',)
+    autocomplete_fields = ('owner',)
+    raw_id_fields = ('duplicate_of',)
+    readonly_fields = ('fingerprint', 'shingle_signature', 'created_at', 'updated_at')
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    action_form = TicketActionForm
+    actions = ('set_status', 'set_priority', 'assign_owner')
+
+    def _action_value(self, request, name):
+        """Clean the named action form field, None (with a message) if it is missing or invalid"""
+        try:
+            value = self.action_form.base_fields[name].clean(request.POST.get(name))
+        except ValidationError as e:
+            self.message_user(request, f"Invalid {name}: {' '.join(e.messages)}", messages.ERROR)
+            return None
+        if value in (None, ''):
+            self.message_user(request, f"Choose a {name.replace('_', ' ')} for this action.", messages.ERROR)
+            return None
+        return value
+
+    # The actions run a single UPDATE, so Ticket.save() and signals are skipped
+
+    @admin.action(description="Set status of selected tickets")
+    def set_status(self, request, queryset):
+        status = self._action_value(request, 'status')
+        if status is None:
+            return
+        # Same as Ticket.save(): closing stops the SLA timer, reopening a
+        # closed ticket restarts it from its priority
+        if is_closed(status):
+            due_at = Value(None, output_field=DateTimeField())
+        else:
+            restarted = [
+                When(priority__iexact=priority, then=Value(compute_due_at(priority)))
+                for priority in settings.TICKET_SLA_MINUTES
+            ]
+            due_at = Case(
+                When(status__in=CLOSED_STATUSES, then=Case(*restarted, default=Value(None))),
+                default=F('due_at'),
+                output_field=DateTimeField(),
+            )
+        updated = queryset.update(status=status, due_at=due_at, updated_at=timezone.now())
+        self.message_user(request, f"{updated} ticket(s) set to {status}.", messages.SUCCESS)
+
+    @admin.action(description="Set priority of selected tickets")
+    def set_priority(self, request, queryset):
+        priority = self._action_value(request, 'priority')
+        if priority is None:
+            return
+        # Same as Ticket.save(): the deadline restarts only when the priority
+        # changes, closed tickets get none
+        updated = queryset.exclude(priority=priority).update(
+            priority=priority,
+            due_at=Case(
+                When(status__in=CLOSED_STATUSES, then=Value(None)),
+                default=Value(compute_due_at(priority)),
+                output_field=DateTimeField(),
+            ),
+            updated_at=timezone.now(),
+        )
+        self.message_user(request, f"{updated} ticket(s) set to {priority} priority.", messages.SUCCESS)
+
+    @admin.action(description="Assign selected tickets to owner")
+    def assign_owner(self, request, queryset):
+        owner_id = self._action_value(request, 'owner_id')
+        if owner_id is None:
+            return
+        if not User.objects.filter(pk=owner_id).exists():
+            self.message_user(request, f"No employee with ID {owner_id}.", messages.ERROR)
+            return
+        updated = queryset.update(owner_id=owner_id, updated_at=timezone.now())
+        self.message_user(request, f"{updated} ticket(s) assigned to employee {owner_id}.", messages.SUCCESS)
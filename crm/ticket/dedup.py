@@ -0,0 +1,97 @@
+"""
+Duplicate detection for incoming tickets.
+
+Each ticket gets a fingerprint, a hash of its normalized phone number and
+source (or source and name when there is no phone number), stored in an
+indexed column together with a MinHash signature of the name and
+description shingles. A new ticket is a duplicate of a recent open ticket
+with the same fingerprint whose signature is similar enough, so the check
+is one index range lookup on (fingerprint, created_at).
+
+Thresholds come from the TICKET_DEDUP setting.
+"""
+import hashlib
+import re
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from .models import CLOSED_STATUSES, Ticket
+
+SHINGLE_SIZE = 4
+SIGNATURE_SLOTS = 16
+# One fixed 64-bit mask per slot, each slot keeps the minimum of (hash XOR mask)
+_SLOT_MASKS = [
+    int.from_bytes(hashlib.sha256(f'slot{i}'.encode()).digest()[:8], 'big')
+    for i in range(SIGNATURE_SLOTS)
+]
+# Enough to compare against a burst of resends without loading many rows
+MAX_CANDIDATES = 20
+
+_NON_WORD_RE = re.compile(r'[^a-z0-9]+')
+
+
+def normalize_text(text):
+    return _NON_WORD_RE.sub(' ', (text or '').lower()).strip()
+
+
+def normalize_phone(phone_number):
+    """Digits only, and only the last ten so country prefixes don't matter"""
+    return re.sub(r'\D', '', phone_number or '')[-10:]
+
+
+def fingerprint(phone_number, source, name):
+    phone = normalize_phone(phone_number)
+    source = (source or '').lower()
+    key = f'{phone}|{source}' if phone else f'|{source}|{normalize_text(name)}'
+    return hashlib.sha1(key.encode()).hexdigest()
+
+
+def shingle_signature(name, description):
+    """MinHash signature of the character shingles, as a hex string"""
+    text = normalize_text(f'{name} {description}')
+    shingles = {text[i:i + SHINGLE_SIZE] for i in range(max(1, len(text) - SHINGLE_SIZE + 1))}
+    hashes = [int.from_bytes(hashlib.blake2b(s.encode(), digest_size=8).digest(), 'big') for s in shingles]
+    slots = [min(h ^ mask for h in hashes) >> 32 for mask in _SLOT_MASKS]
+    return ''.join(f'{slot:08x}' for slot in slots)
+
+
+def similarity(signature_a, signature_b):
+    """Estimated Jaccard similarity of two signatures (share of equal slots)"""
+    if not signature_a or len(signature_a) != len(signature_b):
+        return 0.0
+    slots = range(0, len(signature_a), 8)
+    equal = sum(signature_a[i:i + 8] == signature_b[i:i + 8] for i in slots)
+    return equal / len(slots)
+
+
+def fingerprint_ticket(data):
+    """Return the (fingerprint, shingle_signature) for ticket data"""
+    return (
+        fingerprint(data.get('phone_number'), data.get('source'), data.get('name')),
+        shingle_signature(data.get('name'), data.get('description')),
+    )
+
+
+def find_duplicate(ticket_fingerprint, signature, now=None):
+    """
+    Id of the original of a recent open ticket this one duplicates, or None.
+    A candidate that is itself a duplicate leads to its original, so resends
+    all link to the first ticket instead of forming a chain.
+    """
+    config = settings.TICKET_DEDUP
+    if not config['ENABLED']:
+        return None
+
+    since = (now or timezone.now()) - timedelta(minutes=config['WINDOW_MINUTES'])
+    candidates = (
+        Ticket.objects.filter(fingerprint=ticket_fingerprint, created_at__gte=since)
+        .exclude(status__in=CLOSED_STATUSES)
+        .order_by('-created_at')
+        .values_list('id', 'duplicate_of_id', 'shingle_signature')[:MAX_CANDIDATES]
+    )
+    for ticket_id, original_id, candidate_signature in candidates:
+        if similarity(signature, candidate_signature) >= config['THRESHOLD']:
+            return original_id or ticket_id
+    return None
@@ -0,0 +1,63 @@
+"""
+Idempotency keys for ticket creation.
+
+A client that may retry POST /api/tickets/create/ sends an Idempotency-Key
+header. The first successful create stores the response under
+(owner, key) in the same transaction as the ticket; a retry finds it with
+one lookup on the unique index and gets the stored response back with
+Idempotent-Replayed: true instead of creating the ticket again.
+
+Concurrent first requests with the same key are not locked against each
+other: both create their ticket, the unique constraint lets only one key
+row commit and the other request rolls back and replays the winner's
+response. Failed creates are not stored, so a corrected retry can reuse the
+key. Keys expire after IDEMPOTENCY_KEY_TTL_HOURS, see the
+purge_idempotency_keys command.
+"""
+import hashlib
+import json
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from .models import IdempotencyKey
+
+HEADER = 'Idempotency-Key'
+REPLAYED_HEADER = 'Idempotent-Replayed'
+MAX_KEY_LENGTH = IdempotencyKey._meta.get_field('key').max_length
+
+
+def key_expiry_cutoff(now=None):
+    """Keys created before this time have expired"""
+    return (now or timezone.now()) - timedelta(hours=settings.IDEMPOTENCY_KEY_TTL_HOURS)
+
+
+def hash_request(data):
+    """SHA-256 of the request data, independent of key order"""
+    if hasattr(data, 'lists'):
+        # QueryDict from a form-encoded body
+        data = dict(data.lists())
+    payload = json.dumps(data, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def get_stored(owner, key):
+    """The unexpired stored response for ``key``, or None. Expired keys are deleted."""
+    record = IdempotencyKey.objects.filter(owner=owner, key=key).first()
+    if record is not None and record.created_at < key_expiry_cutoff():
+        record.delete()
+        return None
+    return record
+
+
+def store(owner, key, request_hash, response, ticket_id):
+    """Store a create response, raises IntegrityError if the key was taken meanwhile"""
+    return IdempotencyKey.objects.create(
+        owner=owner,
+        key=key,
+        request_hash=request_hash,
+        ticket_id=ticket_id,
+        response_status=response.status_code,
+        response_body=response.data,
+    )
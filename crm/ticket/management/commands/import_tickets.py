@@ -0,0 +1,197 @@
+import csv
+import io
+import json
+import os
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+
+from ticket.dedup import fingerprint_ticket
+from ticket.models import Ticket
+from ticket.serializers import TicketSerializer, normalize_ticket_data
+from ticket.sla import compute_due_at
+
+User = get_user_model()
+
+# Columns read from each row, anything else is ignored
+TICKET_COLUMNS = ['name', 'description', 'status', 'source', 'priority', 'phone_number']
+OWNER_COLUMN = 'owner_email'
+
+
+class Command(BaseCommand):
+    help = (
+        "Import tickets from a CSV or NDJSON file. Rows are streamed, validated with the "
+        "TicketSerializer rules and written in batches. Owners are matched on the "
+        f"'{OWNER_COLUMN}' column."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='CSV or NDJSON (one JSON object per line) file')
+        parser.add_argument(
+            '--format', choices=['csv', 'ndjson'],
+            help='File format (default: guessed from the file extension)',
+        )
+        parser.add_argument('--batch-size', type=int, default=1000, help='Rows per INSERT (default: 1000)')
+        parser.add_argument(
+            '--copy', action='store_true',
+            help='Write batches with PostgreSQL COPY instead of INSERT',
+        )
+        parser.add_argument(
+            '--checkpoint',
+            help='Checkpoint file; the import resumes after the last committed batch recorded there',
+        )
+
+    def handle(self, *args, **options):
+        path = options['path']
+        if not os.path.exists(path):
+            raise CommandError(f"File not found: {path}")
+        if options['batch_size'] < 1:
+            raise CommandError("--batch-size must be at least 1")
+        if options['copy'] and connection.vendor != 'postgresql':
+            raise CommandError("--copy is only supported on PostgreSQL")
+
+        file_format = options['format'] or ('csv' if path.lower().endswith('.csv') else 'ndjson')
+        checkpoint = options['checkpoint']
+        skip = self.read_checkpoint(checkpoint, path)
+        if skip:
+            self.stdout.write(f"Resuming after row {skip}")
+
+        write_batch = self.copy_batch if options['copy'] else self.insert_batch
+
+        # Resolve owners through one lookup instead of a query per row
+        owners = {email.lower(): pk for email, pk in User.objects.values_list('email', 'id')}
+        # Built once, its fields are reused to validate every row
+        serializer = TicketSerializer()
+
+        imported = rejected = 0
+        row_number = skip
+        batch = []
+        started = time.monotonic()
+
+        for row_number, row in enumerate(self.read_rows(path, file_format), start=1):
+            if row_number <= skip:
+                continue
+
+            ticket = self.build_ticket(serializer, owners, row, row_number)
+            if ticket is None:
+                rejected += 1
+            else:
+                batch.append(ticket)
+
+            if len(batch) >= options['batch_size']:
+                imported += write_batch(batch)
+                batch = []
+                self.write_checkpoint(checkpoint, path, row_number)
+                self.report(imported, rejected, started)
+
+        if batch:
+            imported += write_batch(batch)
+        self.write_checkpoint(checkpoint, path, row_number)
+        self.report(imported, rejected, started)
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {imported} tickets, rejected {rejected} rows"
+        ))
+
+    def read_rows(self, path, file_format):
+        """Yield one dict per row without loading the whole file"""
+        with open(path, newline='', encoding='utf-8') as fh:
+            if file_format == 'csv':
+                yield from csv.DictReader(fh)
+                return
+            for line in fh:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    row = json.loads(line)
+                except ValueError as e:
+                    row = {'__error__': f"Invalid JSON: {e}"}
+                yield row if isinstance(row, dict) else {'__error__': 'Expected a JSON object'}
+
+    def build_ticket(self, serializer, owners, row, row_number):
+        """Validate a row and return an unsaved Ticket, or None if it is rejected"""
+        if '__error__' in row:
+            self.stderr.write(f"Row {row_number}: {row['__error__']}")
+            return None
+
+        # Drop empty cells so the serializer defaults and required checks apply
+        data = {
+            field: row[field] for field in TICKET_COLUMNS
+            if row.get(field) not in (None, '')
+        }
+        try:
+            validated = serializer.run_validation(normalize_ticket_data(data))
+        except ValidationError as e:
+            self.stderr.write(f"Row {row_number}: {json.dumps(e.detail)}")
+            return None
+
+        owner_email = (row.get(OWNER_COLUMN) or '').strip().lower()
+        owner_id = None
+        if owner_email:
+            owner_id = owners.get(owner_email)
+            if owner_id is None:
+                self.stderr.write(f"Row {row_number}: unknown owner {owner_email}")
+                return None
+
+        # bulk_create skips Ticket.save(), set the SLA deadline and fingerprint here
+        ticket_fingerprint, signature = fingerprint_ticket(validated)
+        return Ticket(
+            owner_id=owner_id,
+            due_at=compute_due_at(validated.get('priority'), status=validated.get('status')),
+            fingerprint=ticket_fingerprint,
+            shingle_signature=signature,
+            **validated
+        )
+
+    def insert_batch(self, batch):
+        with transaction.atomic():
+            Ticket.objects.bulk_create(batch)
+        return len(batch)
+
+    def copy_batch(self, batch):
+        """Stream a batch through PostgreSQL COPY, bypassing the ORM insert path"""
+        now = timezone.now()
+        columns = TICKET_COLUMNS + [
+            'owner_id', 'created_at', 'updated_at', 'due_at', 'fingerprint', 'shingle_signature',
+        ]
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for ticket in batch:
+            ticket.created_at = ticket.updated_at = now
+            writer.writerow([getattr(ticket, column) for column in columns])
+        buffer.seek(0)
+
+        sql = (
+            f"COPY {Ticket._meta.db_table} ({', '.join(columns)}) "
+            f"FROM STDIN WITH (FORMAT csv)"
+        )
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.cursor.copy_expert(sql, buffer)
+        return len(batch)
+
+    def read_checkpoint(self, checkpoint, path):
+        if not checkpoint or not os.path.exists(checkpoint):
+            return 0
+        with open(checkpoint) as fh:
+            state = json.load(fh)
+        if state.get('path') != os.path.abspath(path):
+            raise CommandError(f"Checkpoint {checkpoint} belongs to {state.get('path')}")
+        return state.get('rows', 0)
+
+    def write_checkpoint(self, checkpoint, path, rows):
+        """Record the rows committed so far; written atomically so a crash can't corrupt it"""
+        if not checkpoint:
+            return
+        tmp = f"{checkpoint}.tmp"
+        with open(tmp, 'w') as fh:
+            json.dump({'path': os.path.abspath(path), 'rows': rows}, fh)
+        os.replace(tmp, checkpoint)
+
+    def report(self, imported, rejected, started):
+        elapsed = time.monotonic() - started
+        rate = imported / elapsed if elapsed else 0
+        self.stdout.write(f"{imported} imported, {rejected} rejected ({rate:.0f} tickets/s)")
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from ticket.idempotency import key_expiry_cutoff
+from ticket.models import IdempotencyKey
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete ticket idempotency keys older than IDEMPOTENCY_KEY_TTL_HOURS, in batches "
+        "found through the created_at index. Run it periodically, e.g. from cron."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Keys deleted per statement')
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError("--batch-size must be at least 1")
+
+        cutoff = key_expiry_cutoff()
+        expired = IdempotencyKey.objects.filter(created_at__lt=cutoff)
+        deleted = 0
+        while True:
+            # Short deletes keep row locks and WAL bursts small on a big table
+            ids = list(expired.order_by('created_at').values_list('id', flat=True)[:options['batch_size']])
+            if not ids:
+                break
+            deleted += IdempotencyKey.objects.filter(id__in=ids).delete()[0]
+        self.stdout.write(f"Deleted {deleted} expired idempotency keys")
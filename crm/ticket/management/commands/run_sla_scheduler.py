@@ -0,0 +1,81 @@
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from ticket.models import Ticket
+from ticket.sla import escalate, open_tickets_q
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        "Escalate tickets whose SLA deadline passed. Only the next overdue batch is read "
+        "(through the partial due_at index), then the scheduler sleeps until the next deadline."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100, help='Tickets escalated per transaction')
+        parser.add_argument(
+            '--max-sleep', type=float, default=60,
+            help='Longest sleep in seconds, bounds how late newly created deadlines are noticed',
+        )
+        parser.add_argument(
+            '--min-sleep', type=float, default=1,
+            help='Shortest sleep in seconds, keeps the loop from spinning while overdue tickets are locked',
+        )
+        parser.add_argument('--once', action='store_true', help='Escalate what is overdue now and exit')
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError("--batch-size must be at least 1")
+        if not 0 < options['min_sleep'] <= options['max_sleep']:
+            raise CommandError("--min-sleep must be positive and at most --max-sleep")
+
+        escalation_owner_id = None
+        owner_email = settings.TICKET_SLA_ESCALATION_OWNER
+        if owner_email:
+            escalation_owner_id = User.objects.filter(email__iexact=owner_email).values_list('id', flat=True).first()
+            if escalation_owner_id is None:
+                raise CommandError(f"Escalation owner {owner_email} does not exist")
+
+        while True:
+            escalated = self.escalate_batch(options['batch_size'], escalation_owner_id)
+            if escalated == options['batch_size']:
+                # There may be more overdue tickets, don't sleep
+                continue
+            if options['once']:
+                return
+            time.sleep(self.seconds_until_next_deadline(options['min_sleep'], options['max_sleep']))
+
+    def escalate_batch(self, batch_size, escalation_owner_id):
+        now = timezone.now()
+        with transaction.atomic():
+            # skip_locked lets several schedulers share the work
+            overdue = list(
+                Ticket.objects.select_for_update(skip_locked=True)
+                .filter(open_tickets_q(), due_at__lte=now)
+                .order_by('due_at')[:batch_size]
+            )
+            for ticket in overdue:
+                action = escalate(ticket, escalation_owner_id, now)
+                self.stdout.write(f"Ticket {ticket.id}: {action}")
+        return len(overdue)
+
+    def seconds_until_next_deadline(self, min_sleep, max_sleep):
+        now = timezone.now()
+        # Tickets already overdue are locked by another scheduler (escalate_batch
+        # skipped them), waiting for them would spin
+        next_due = (
+            Ticket.objects.filter(open_tickets_q(), due_at__gt=now)
+            .order_by('due_at')
+            .values_list('due_at', flat=True)
+            .first()
+        )
+        if next_due is None:
+            return max_sleep
+        return min(max(min_sleep, (next_due - now).total_seconds()), max_sleep)
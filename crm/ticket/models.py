@@ -1,9 +1,31 @@
 from django.db import models
 from django.contrib.auth import get_user_model
+from django.core.serializers.json import DjangoJSONEncoder
 from django.core.validators import MinLengthValidator
 
 User = get_user_model()
 
+# Statuses for which no SLA timer runs
+CLOSED_STATUSES = ('resolved', 'closed')
+
+
+# Fields the duplicate detection fingerprint and signature are built from
+FINGERPRINT_FIELDS = ('name', 'description', 'source', 'phone_number')
+
+
+def is_closed(status):
+    return (status or '').lower() in CLOSED_STATUSES
+
+
+def _save_also(kwargs, *field_names):
+    """Add fields computed in save() to its update_fields, if they are restricted"""
+    update_fields = kwargs.get('update_fields')
+    if update_fields is not None:
+        kwargs['update_fields'] = list(update_fields) + [
+            name for name in field_names if name not in update_fields
+        ]
+
+
 class Ticket(models.Model):
     name = models.CharField(max_length=255, validators=[MinLengthValidator(3)])
     description = models.TextField()
@@ -14,6 +36,105 @@ class Ticket(models.Model):
     phone_number = models.CharField(max_length=20, blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # SLA deadline, computed from the priority on create and priority change
+    due_at = models.DateTimeField(null=True, blank=True)
+    # Duplicate detection (see ticket/dedup.py)
+    fingerprint = models.CharField(max_length=40, blank=True, default='')
+    shingle_signature = models.CharField(max_length=128, blank=True, default='')
+    duplicate_of = models.ForeignKey(
+        'self', on_delete=models.SET_NULL, null=True, blank=True, related_name='duplicates'
+    )
+
+    class Meta:
+        indexes = [
+            # Only open tickets with a deadline, the SLA scheduler reads them in due_at order
+            models.Index(
+                fields=['due_at'],
+                name='ticket_open_due_at_idx',
+                condition=models.Q(due_at__isnull=False) & ~models.Q(status__in=CLOSED_STATUSES),
+            ),
+            # Recent tickets with the same fingerprint, for duplicate detection
+            models.Index(fields=['fingerprint', 'created_at'], name='ticket_fingerprint_idx'),
+            # Admin changelist filters and default ordering
+            models.Index(fields=['status'], name='ticket_status_idx'),
+            models.Index(fields=['priority'], name='ticket_priority_idx'),
+            models.Index(fields=['created_at'], name='ticket_created_at_idx'),
+        ]
 
     def __str__(self):
         return f"{self.name} - {self.status}"
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the stored priority and status to detect changes on save
+        instance._loaded_priority = instance.__dict__.get('priority')
+        instance._loaded_status = instance.__dict__.get('status')
+        # and the fingerprinted fields, unless some were deferred
+        if instance._has_fingerprint_fields():
+            instance._loaded_fingerprint_data = instance._fingerprint_data()
+        return instance
+
+    def _has_fingerprint_fields(self):
+        return all(field in self.__dict__ for field in FINGERPRINT_FIELDS)
+
+    def _fingerprint_data(self):
+        return {field: getattr(self, field) for field in FINGERPRINT_FIELDS}
+
+    def save(self, *args, **kwargs):
+        from .dedup import fingerprint_ticket
+        from .sla import compute_due_at
+
+        loaded_fingerprint_data = getattr(self, '_loaded_fingerprint_data', None)
+        update_fields = kwargs.get('update_fields')
+        saves_fingerprint_fields = update_fields is None or not set(update_fields).isdisjoint(FINGERPRINT_FIELDS)
+        if self._state.adding and not self.fingerprint:
+            self.fingerprint, self.shingle_signature = fingerprint_ticket(self._fingerprint_data())
+        elif (
+            saves_fingerprint_fields
+            and loaded_fingerprint_data is not None
+            and self._fingerprint_data() != loaded_fingerprint_data
+        ):
+            # Later duplicate lookups must compare against the edited caller and text
+            self.fingerprint, self.shingle_signature = fingerprint_ticket(self._fingerprint_data())
+            _save_also(kwargs, 'fingerprint', 'shingle_signature')
+
+        loaded_priority = getattr(self, '_loaded_priority', None)
+        loaded_status = getattr(self, '_loaded_status', None)
+        priority_changed = loaded_priority is not None and self.priority != loaded_priority
+        # Closing stops the SLA timer, reopening restarts it
+        closed_changed = loaded_status is not None and is_closed(self.status) != is_closed(loaded_status)
+        if self._state.adding or priority_changed or closed_changed:
+            self.due_at = compute_due_at(self.priority, status=self.status)
+            _save_also(kwargs, 'due_at')
+        super().save(*args, **kwargs)
+        self._loaded_priority = self.priority
+        self._loaded_status = self.status
+        if saves_fingerprint_fields and self._has_fingerprint_fields():
+            self._loaded_fingerprint_data = self._fingerprint_data()
+
+
+class IdempotencyKey(models.Model):
+    """
+    Response to a ticket create sent with an Idempotency-Key header, replayed
+    when the client retries with the same key (see ticket/idempotency.py)
+    """
+    owner = models.ForeignKey(User, on_delete=models.CASCADE, related_name='idempotency_keys')
+    key = models.CharField(max_length=255)
+    # SHA-256 of the request data, a reused key with different data is rejected
+    request_hash = models.CharField(max_length=64)
+    ticket = models.ForeignKey(Ticket, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    response_status = models.PositiveSmallIntegerField()
+    response_body = models.JSONField(encoder=DjangoJSONEncoder)
+    # Indexed for purge_idempotency_keys
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        constraints = [
+            # Also the index retries are looked up by; concurrent first requests
+            # with one key race on it and all but one roll back
+            models.UniqueConstraint(fields=['owner', 'key'], name='ticket_idempotency_owner_key_uniq'),
+        ]
+
+    def __str__(self):
+        return f"{self.key} -> {self.ticket_id}"
@@ -4,6 +4,28 @@ from django.contrib.auth import get_user_model
 
 User = get_user_model()
 
+# Defaults for new tickets when the client doesn't send them
+TICKET_CREATE_DEFAULTS = {
+    'status': 'open',
+    'priority': 'medium',
+}
+
+
+def normalize_ticket_data(data):
+    """
+    Apply the ticket creation rules to incoming data, in place:
+    lowercase the source, status and priority and fill in the default
+    status and priority.
+    """
+    # Lowercase to match our choices, SLA and dedup match statuses exactly
+    for field in ('source', 'status', 'priority'):
+        if isinstance(data.get(field), str):
+            data[field] = data[field].lower()
+    for field, default in TICKET_CREATE_DEFAULTS.items():
+        if field not in data:
+            data[field] = default
+    return data
+
 class UserSerializer(serializers.ModelSerializer):
     class Meta:
         model = User
@@ -17,9 +39,10 @@ class TicketSerializer(serializers.ModelSerializer):
         model = Ticket
         fields = [
             'id', 'name', 'description', 'status', 'source', 'priority',
-            'owner', 'phone_number', 'created_at', 'updated_at'
+            'owner', 'phone_number', 'created_at', 'updated_at', 'due_at',
+            'duplicate_of'
         ]
-        read_only_fields = ['id', 'owner', 'created_at', 'updated_at']
+        read_only_fields = ['id', 'owner', 'created_at', 'updated_at', 'due_at', 'duplicate_of']
     
     def create(self, validated_data):
         # Set the owner to the current user if not provided
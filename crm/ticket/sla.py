@@ -0,0 +1,63 @@
+"""
+SLA deadlines and escalation for tickets.
+
+Every open ticket gets a due time from its priority (TICKET_SLA_MINUTES).
+When it passes, the run_sla_scheduler command escalates the ticket one
+priority up the ladder with a new deadline; tickets already at the top are
+reassigned to TICKET_SLA_ESCALATION_OWNER, or their timer stops when no
+escalation owner is configured.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import CLOSED_STATUSES, is_closed
+
+# Escalation order, lowest priority first
+PRIORITY_LADDER = ['low', 'medium', 'high', 'urgent']
+
+
+def open_tickets_q():
+    """Filter matching the tickets covered by the partial due_at index"""
+    return Q(due_at__isnull=False) & ~Q(status__in=CLOSED_STATUSES)
+
+
+def compute_due_at(priority, start=None, status=None):
+    """
+    Deadline for a ticket of this priority, or None if the ticket is closed
+    or the priority has no SLA
+    """
+    if is_closed(status):
+        return None
+    minutes = settings.TICKET_SLA_MINUTES.get((priority or '').lower())
+    if minutes is None:
+        return None
+    return (start or timezone.now()) + timedelta(minutes=minutes)
+
+
+def escalate(ticket, escalation_owner_id=None, now=None):
+    """
+    Escalate an overdue ticket and save it. Returns a short description of
+    what was done.
+    """
+    now = now or timezone.now()
+    priority = (ticket.priority or '').lower()
+
+    if priority in PRIORITY_LADDER[:-1]:
+        # save() sees the priority change and sets the new deadline
+        ticket.priority = PRIORITY_LADDER[PRIORITY_LADDER.index(priority) + 1]
+        ticket.save(update_fields=['priority', 'updated_at'])
+        return f"priority raised to {ticket.priority}"
+
+    if escalation_owner_id and ticket.owner_id != escalation_owner_id:
+        ticket.owner_id = escalation_owner_id
+        ticket.due_at = compute_due_at(priority, now)
+        ticket.save(update_fields=['owner', 'due_at', 'updated_at'])
+        return f"reassigned to employee {escalation_owner_id}"
+
+    # Nothing left to escalate to, stop the timer
+    ticket.due_at = None
+    ticket.save(update_fields=['due_at', 'updated_at'])
+    return "SLA timer stopped"
@@ -1,9 +1,24 @@
-from django.test import TestCase
+import gzip
+import json
+import os
+import tempfile
+from datetime import timedelta
+from io import StringIO
+from unittest import mock, skipUnless
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
 from django.urls import reverse
+from django.utils import timezone
 from rest_framework import status
-from rest_framework.test import APITestCase
+from rest_framework.test import APIClient, APITestCase
 from django.contrib.auth import get_user_model
-from ticket.models import Ticket
+from ticket import idempotency
+from ticket.dedup import fingerprint_ticket
+from ticket.models import IdempotencyKey, Ticket
+from ticket.sla import compute_due_at, open_tickets_q
+from crm.renderers import msgpack
+from crm.budgets import PerformanceBudgetMixin
 
 User = get_user_model()
 
@@ -81,3 +96,607 @@ class CreateTicketAPITest(APITestCase):
         
         # Should return 401 Unauthorized or 403 Forbidden
         self.assertIn(response.status_code, [status.HTTP_401_UNAUTHORIZED, status.HTTP_403_FORBIDDEN])
+
+
+class TicketEndpointBudgetTest(PerformanceBudgetMixin, APITestCase):
+    """Query and time budgets for every URL in ticket/urls.py"""
+    TICKET_COUNT = 200
+    OWNER_COUNT = 10
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.owners = [
+            User.objects.create_user(
+                username=f'owner{i}', email=f'owner{i}@example.com', password='testpass123'
+            )
+            for i in range(cls.OWNER_COUNT)
+        ]
+        Ticket.objects.bulk_create([
+            Ticket(
+                name=f'Ticket {i}',
+                description='Budget test ticket',
+                source='email',
+                status='open' if i % 2 else 'new',
+                priority='high' if i % 3 else 'low',
+                owner=cls.owners[i % cls.OWNER_COUNT],
+            )
+            for i in range(cls.TICKET_COUNT)
+        ])
+        cls.user = cls.owners[0]
+
+    def setUp(self):
+        self.client.force_authenticate(user=self.user)
+
+    def test_batch_budget(self):
+        ids = list(Ticket.objects.values_list('id', flat=True)[:100])
+        with self.assertQueryBudget(1), self.assertTimeBudget(0.5):
+            response = self.client.get(reverse('ticket:ticket-batch'), {'ids': ','.join(map(str, ids))})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['data']), 100)
+
+    def test_detail_budget(self):
+        ticket = Ticket.objects.first()
+        with self.assertQueryBudget(1), self.assertTimeBudget(0.5):
+            response = self.client.get(reverse('ticket:ticket-detail', args=[ticket.id]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_list_budget(self):
+        # The owner is joined, so the query count doesn't grow with the data size
+        with self.assertQueryBudget(1), self.assertTimeBudget(1.0):
+            response = self.client.get(reverse('ticket:ticket-list'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), self.TICKET_COUNT)
+
+    def test_filtered_list_budget(self):
+        url = reverse('ticket:ticket-list')
+        with self.assertQueryBudget(1), self.assertTimeBudget(0.5):
+            response = self.client.get(url, {'status': 'open', 'priority': 'high', 'owner': self.user.id})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_create_budget(self):
+        data = {'name': 'Budget ticket', 'description': 'Created in a budget test', 'source': 'Web'}
+        # Duplicate lookup, then the INSERT
+        with self.assertQueryBudget(2), self.assertTimeBudget(0.5):
+            response = self.client.post(reverse('ticket:create-ticket'), data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    def test_update_budget(self):
+        ticket = Ticket.objects.first()
+        url = reverse('ticket:update-ticket', args=[ticket.id])
+        # Fetch with the owner joined, then the UPDATE
+        with self.assertQueryBudget(2), self.assertTimeBudget(0.5):
+            response = self.client.patch(url, {'status': 'Closed'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+
+class ImportTicketsCommandTest(TestCase):
+    def setUp(self):
+        self.owner = User.objects.create_user(
+            username='importer', email='Importer@example.com', password='testpass123'
+        )
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+
+    def write_file(self, name, content):
+        path = os.path.join(self.tmpdir.name, name)
+        with open(path, 'w', newline='') as fh:
+            fh.write(content)
+        return path
+
+    def call(self, *args):
+        stdout, stderr = StringIO(), StringIO()
+        call_command('import_tickets', *args, stdout=stdout, stderr=stderr)
+        return stdout.getvalue(), stderr.getvalue()
+
+    def test_import_csv_applies_serializer_rules(self):
+        path = self.write_file('tickets.csv', (
+            'name,description,source,priority,phone_number,owner_email\n'
+            'Printer jam,Paper stuck,EMAIL,,+123,importer@example.com\n'
+            'No,Name too short,web,low,,\n'
+            'Lost owner,Owner does not exist,web,low,,ghost@example.com\n'
+        ))
+        _, stderr = self.call(path, '--batch-size', '1')
+
+        ticket = Ticket.objects.get()
+        self.assertEqual(ticket.source, 'email')
+        self.assertEqual(ticket.status, 'open')
+        self.assertEqual(ticket.priority, 'medium')
+        self.assertEqual(ticket.owner, self.owner)
+        self.assertIn('Row 2', stderr)
+        self.assertIn('Row 3: unknown owner', stderr)
+
+    def test_import_ndjson_resumes_from_checkpoint(self):
+        rows = [
+            {'name': f'Ticket {i}', 'description': 'Imported', 'source': 'Phone'}
+            for i in range(5)
+        ]
+        path = self.write_file('tickets.ndjson', '\n'.join(json.dumps(row) for row in rows))
+        checkpoint = os.path.join(self.tmpdir.name, 'import.checkpoint')
+        with open(checkpoint, 'w') as fh:
+            json.dump({'path': os.path.abspath(path), 'rows': 3}, fh)
+
+        self.call(path, '--checkpoint', checkpoint, '--batch-size', '2')
+
+        self.assertEqual(
+            list(Ticket.objects.order_by('id').values_list('name', flat=True)),
+            ['Ticket 3', 'Ticket 4'],
+        )
+        with open(checkpoint) as fh:
+            self.assertEqual(json.load(fh)['rows'], 5)
+
+    def test_imported_closed_tickets_get_no_deadline(self):
+        path = self.write_file('tickets.ndjson', json.dumps(
+            {'name': 'Old ticket', 'description': 'Legacy', 'source': 'web', 'status': 'Closed', 'priority': 'High'}
+        ))
+        self.call(path)
+
+        ticket = Ticket.objects.get()
+        self.assertEqual((ticket.status, ticket.priority), ('closed', 'high'))
+        self.assertIsNone(ticket.due_at)
+
+
+class TicketResponseFormatTest(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='formats', email='formats@example.com', password='testpass123'
+        )
+        self.client.force_authenticate(user=self.user)
+        Ticket.objects.create(
+            name='Format ticket', description='Déjà vu', source='email', owner=self.user
+        )
+
+    def test_json_list(self):
+        response = self.client.get(reverse('ticket:ticket-list'))
+        self.assertEqual(response['Content-Type'], 'application/json')
+        body = json.loads(response.content)
+        self.assertEqual(body[0]['description'], 'Déjà vu')
+        self.assertEqual(body[0]['owner']['id'], self.user.id)
+
+    @skipUnless(msgpack, 'msgpack is not installed')
+    def test_msgpack_round_trip(self):
+        data = {'name': 'Packed ticket', 'description': 'Sent as MessagePack', 'source': 'Chat'}
+        response = self.client.post(
+            reverse('ticket:create-ticket'),
+            msgpack.packb(data),
+            content_type='application/msgpack',
+            HTTP_ACCEPT='application/msgpack',
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response['Content-Type'], 'application/msgpack')
+        body = msgpack.unpackb(response.content)
+        self.assertEqual(body['data']['source'], 'chat')
+        self.assertEqual(body['data']['owner']['id'], self.user.id)
+
+
+class TicketListCompressionTest(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            username='compress', email='compress@example.com', password='testpass123'
+        )
+        Ticket.objects.bulk_create([
+            Ticket(name=f'Ticket {i}', description='Repetitive description', source='web', owner=cls.user)
+            for i in range(50)
+        ])
+
+    def setUp(self):
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse('ticket:ticket-list')
+
+    def test_large_list_is_gzipped(self):
+        response = self.client.get(self.url, HTTP_ACCEPT_ENCODING='gzip;q=1.0, br;q=0')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response['Vary'])
+        self.assertEqual(len(json.loads(gzip.decompress(response.content))), 50)
+
+    def test_small_response_is_not_compressed(self):
+        Ticket.objects.exclude(pk=Ticket.objects.first().pk).delete()
+        response = self.client.get(self.url, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertFalse(response.has_header('Content-Encoding'))
+
+    def test_identity_only_client(self):
+        response = self.client.get(self.url, HTTP_ACCEPT_ENCODING='identity')
+        self.assertFalse(response.has_header('Content-Encoding'))
+
+
+@override_settings(TICKET_SLA_MINUTES={'low': 600, 'medium': 120, 'high': 30, 'urgent': 10})
+class TicketSLATest(TestCase):
+    def setUp(self):
+        self.owner = User.objects.create_user(
+            username='sla', email='sla@example.com', password='testpass123'
+        )
+
+    def create_ticket(self, **kwargs):
+        fields = {'name': 'SLA ticket', 'description': 'Needs an answer', 'source': 'email', 'owner': self.owner}
+        fields.update(kwargs)
+        return Ticket.objects.create(**fields)
+
+    def assertDueIn(self, ticket, minutes):
+        expected = timezone.now() + timedelta(minutes=minutes)
+        self.assertAlmostEqual(ticket.due_at, expected, delta=timedelta(seconds=30))
+
+    def test_due_at_follows_priority(self):
+        ticket = self.create_ticket(priority='high')
+        self.assertDueIn(ticket, 30)
+
+        ticket = Ticket.objects.get(pk=ticket.pk)
+        ticket.priority = 'low'
+        ticket.save()
+        self.assertDueIn(Ticket.objects.get(pk=ticket.pk), 600)
+
+    def test_other_changes_keep_the_deadline(self):
+        ticket = self.create_ticket(priority='high')
+        due_at = ticket.due_at
+
+        ticket = Ticket.objects.get(pk=ticket.pk)
+        ticket.status = 'pending'
+        ticket.save()
+        self.assertEqual(Ticket.objects.get(pk=ticket.pk).due_at, due_at)
+
+    def test_closed_tickets_get_no_deadline(self):
+        self.assertIsNone(self.create_ticket(priority='high', status='closed').due_at)
+
+        client = APIClient()
+        client.force_authenticate(user=self.owner)
+        response = client.post(reverse('ticket:create-ticket'), {
+            'name': 'Closed on arrival', 'description': 'Already handled',
+            'source': 'email', 'status': 'Closed', 'priority': 'High',
+        }, format='json')
+        ticket = Ticket.objects.get(pk=response.data['data']['id'])
+        self.assertEqual((ticket.status, ticket.priority), ('closed', 'high'))
+        self.assertIsNone(ticket.due_at)
+        self.assertFalse(Ticket.objects.filter(open_tickets_q(), pk=ticket.pk).exists())
+
+    def test_closing_stops_and_reopening_restarts_the_deadline(self):
+        client = APIClient()
+        client.force_authenticate(user=self.owner)
+        response = client.post(reverse('ticket:create-ticket'), {
+            'name': 'Closed on arrival', 'description': 'Already handled',
+            'source': 'email', 'status': 'closed', 'priority': 'high',
+        }, format='json')
+        ticket_id = response.data['data']['id']
+        update_url = reverse('ticket:update-ticket', args=[ticket_id])
+
+        client.patch(update_url, {'status': 'open'}, format='json')
+        ticket = Ticket.objects.get(pk=ticket_id)
+        self.assertDueIn(ticket, 30)
+        self.assertTrue(Ticket.objects.filter(open_tickets_q(), pk=ticket_id).exists())
+
+        client.patch(update_url, {'status': 'Resolved'}, format='json')
+        self.assertIsNone(Ticket.objects.get(pk=ticket_id).due_at)
+
+        # Reopened days later, the deadline starts over instead of being long overdue
+        client.patch(update_url, {'status': 'pending'}, format='json')
+        self.assertDueIn(Ticket.objects.get(pk=ticket_id), 30)
+
+    def test_scheduler_escalates_overdue_open_tickets(self):
+        overdue = self.create_ticket(priority='medium')
+        closed = self.create_ticket(priority='medium', status='closed')
+        not_due = self.create_ticket(priority='medium')
+        past = timezone.now() - timedelta(minutes=1)
+        Ticket.objects.filter(pk__in=[overdue.pk, closed.pk]).update(due_at=past)
+
+        call_command('run_sla_scheduler', '--once', stdout=StringIO())
+
+        overdue.refresh_from_db()
+        self.assertEqual(overdue.priority, 'high')
+        self.assertDueIn(overdue, 30)
+        self.assertEqual(Ticket.objects.get(pk=closed.pk).priority, 'medium')
+        self.assertEqual(Ticket.objects.get(pk=not_due.pk).priority, 'medium')
+
+    def test_scheduler_sleeps_past_locked_overdue_tickets(self):
+        from ticket.management.commands.run_sla_scheduler import Command
+
+        # Overdue but locked by another scheduler, the next deadline is an hour away
+        overdue = self.create_ticket(priority='medium')
+        Ticket.objects.filter(pk=overdue.pk).update(due_at=timezone.now() - timedelta(minutes=1))
+        self.create_ticket(priority='urgent')
+
+        seconds = Command().seconds_until_next_deadline(min_sleep=1, max_sleep=60)
+        self.assertEqual(seconds, 60)
+
+        # A deadline due in a moment still sleeps at least min_sleep
+        Ticket.objects.exclude(pk=overdue.pk).update(due_at=timezone.now() + timedelta(milliseconds=200))
+        self.assertEqual(Command().seconds_until_next_deadline(min_sleep=1, max_sleep=60), 1)
+
+    def test_scheduler_reassigns_urgent_tickets(self):
+        manager = User.objects.create_user(
+            username='manager', email='manager@example.com', password='testpass123'
+        )
+        ticket = self.create_ticket(priority='urgent')
+        Ticket.objects.filter(pk=ticket.pk).update(due_at=timezone.now() - timedelta(minutes=1))
+
+        with override_settings(TICKET_SLA_ESCALATION_OWNER='manager@example.com'):
+            call_command('run_sla_scheduler', '--once', stdout=StringIO())
+
+        ticket.refresh_from_db()
+        self.assertEqual(ticket.owner, manager)
+        self.assertDueIn(ticket, 10)
+
+
+class DuplicateTicketTest(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='dedup', email='dedup@example.com', password='testpass123'
+        )
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse('ticket:create-ticket')
+        self.data = {
+            'name': 'Internet is down',
+            'description': 'Customer says the internet connection dropped this morning',
+            'source': 'phone',
+            'phone_number': '+1 (555) 123-4567',
+        }
+
+    def test_resent_ticket_is_linked(self):
+        first = self.client.post(self.url, self.data, format='json').data['data']
+        resent = dict(self.data, phone_number='5551234567', source='Phone')
+        second = self.client.post(self.url, resent, format='json')
+
+        self.assertEqual(second.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(second.data['data']['duplicate_of'], first['id'])
+
+    def test_repeated_resends_link_to_the_original(self):
+        first = self.client.post(self.url, self.data, format='json').data['data']
+        for _ in range(2):
+            response = self.client.post(self.url, self.data, format='json')
+            self.assertEqual(response.data['data']['duplicate_of'], first['id'])
+
+    def test_edited_ticket_is_fingerprinted_again(self):
+        first = self.client.post(self.url, self.data, format='json').data['data']
+        self.client.put(
+            reverse('ticket:update-ticket', args=[first['id']]),
+            dict(self.data, phone_number='+1 555 987 6543'), format='json'
+        )
+        ticket = Ticket.objects.get(pk=first['id'])
+        self.assertEqual(
+            (ticket.fingerprint, ticket.shingle_signature),
+            fingerprint_ticket(dict(self.data, phone_number='+1 555 987 6543')),
+        )
+
+        # The old caller no longer matches, the new one does
+        response = self.client.post(self.url, self.data, format='json')
+        self.assertIsNone(response.data['data']['duplicate_of'])
+        response = self.client.post(self.url, dict(self.data, phone_number='5559876543'), format='json')
+        self.assertEqual(response.data['data']['duplicate_of'], first['id'])
+
+    def test_different_ticket_from_same_caller_is_not_a_duplicate(self):
+        self.client.post(self.url, self.data, format='json')
+        other = dict(self.data, name='Invoice question', description='Asks why the last invoice doubled')
+        response = self.client.post(self.url, other, format='json')
+        self.assertIsNone(response.data['data']['duplicate_of'])
+
+    def test_closed_tickets_are_ignored(self):
+        self.client.post(self.url, self.data, format='json')
+        Ticket.objects.update(status='closed')
+        response = self.client.post(self.url, self.data, format='json')
+        self.assertIsNone(response.data['data']['duplicate_of'])
+
+    def test_reject_mode(self):
+        first = self.client.post(self.url, self.data, format='json').data['data']
+        with self.settings(TICKET_DEDUP={'ENABLED': True, 'WINDOW_MINUTES': 60, 'THRESHOLD': 0.8, 'ACTION': 'reject'}):
+            response = self.client.post(self.url, self.data, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(response.data['duplicate_of'], first['id'])
+        self.assertEqual(Ticket.objects.count(), 1)
+
+
+class TicketFetchAPITest(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='fetch', email='fetch@example.com', password='testpass123'
+        )
+        self.client.force_authenticate(user=self.user)
+        self.tickets = [
+            Ticket.objects.create(name=f'Ticket {i}', description='Fetch me', source='web', owner=self.user)
+            for i in range(3)
+        ]
+        self.url = reverse('ticket:ticket-batch')
+
+    def test_detail(self):
+        ticket = self.tickets[1]
+        response = self.client.get(reverse('ticket:ticket-detail', args=[ticket.id]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['name'], 'Ticket 1')
+        self.assertEqual(response.data['owner']['id'], self.user.id)
+
+    def test_detail_not_found(self):
+        response = self.client.get(reverse('ticket:ticket-detail', args=[9999]))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_batch_keeps_order_and_reports_missing(self):
+        first, second, third = (ticket.id for ticket in self.tickets)
+        response = self.client.get(self.url, {'ids': f'{third},9999,{first},{third}'})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([ticket['id'] for ticket in response.data['data']], [third, first])
+        self.assertEqual(response.data['missing'], [9999])
+
+    def test_batch_post(self):
+        ids = [ticket.id for ticket in reversed(self.tickets)]
+        response = self.client.post(self.url, {'ids': ids}, format='json')
+        self.assertEqual([ticket['id'] for ticket in response.data['data']], ids)
+
+    def test_batch_rejects_bad_input(self):
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.client.get(self.url, {'ids': '1,x'}).status_code, status.HTTP_400_BAD_REQUEST)
+        with self.settings(TICKET_BATCH_MAX_IDS=2):
+            response = self.client.get(self.url, {'ids': '1,2,3'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_batch_rejects_ids_that_are_not_ticket_ids(self):
+        for ids in ['99999999999999999999999', '0', '-1', '1.5', '\u0661']:
+            with self.subTest(ids=ids):
+                response = self.client.get(self.url, {'ids': ids})
+                self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        for ids in [[True], [1.9], [2 ** 63], [None]]:
+            with self.subTest(ids=ids):
+                response = self.client.post(self.url, {'ids': ids}, format='json')
+                self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.client.post(self.url, {'ids': [self.tickets[0].pk, 2.0]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+
+class TicketAdminTest(PerformanceBudgetMixin, TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_superuser(
+            username='admin', email='admin@example.com', password='testpass123'
+        )
+        self.client.force_login(self.admin)
+        self.tickets = [
+            Ticket.objects.create(
+                name=f'Ticket {i}', description=f'Issue number {i}', source='email',
+                priority='low', owner=self.admin,
+            )
+            for i in range(5)
+        ]
+        self.changelist_url = reverse('admin:ticket_ticket_changelist')
+
+    def _run_action(self, action, **data):
+        return self.client.post(self.changelist_url, {
+            'action': action,
+            '_selected_action': [ticket.pk for ticket in self.tickets[:3]],
+            **data,
+        })
+
+    def test_changelist_query_count_does_not_grow_with_rows(self):
+        # session, user, paginated count, rows with owners joined
+        with self.assertQueryBudget(4):
+            response = self.client.get(self.changelist_url, {'status': 'new', 'priority': 'low'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context['cl'].result_list), 5)
+
+    def test_set_status_runs_one_update(self):
+        # session, user and the changelist count the admin runs before any action
+        with self.assertQueryBudget(4) as captured:
+            self._run_action('set_status', status='closed')
+        updates = [q for q in captured.captured_queries if q['sql'].startswith('UPDATE')]
+        self.assertEqual(len(updates), 1)
+        self.assertEqual(Ticket.objects.filter(status='closed').count(), 3)
+
+    def test_set_priority_restarts_the_deadline(self):
+        old_due_at = self.tickets[0].due_at
+        self._run_action('set_priority', priority='urgent')
+        ticket = Ticket.objects.get(pk=self.tickets[0].pk)
+        self.assertEqual(ticket.priority, 'urgent')
+        self.assertLess(ticket.due_at, old_due_at)
+        self.assertEqual(Ticket.objects.filter(priority='urgent').count(), 3)
+
+    def test_set_priority_leaves_closed_tickets_without_deadline(self):
+        Ticket.objects.filter(pk=self.tickets[1].pk).update(status='closed', due_at=None)
+        self._run_action('set_priority', priority='urgent')
+        self.assertIsNone(Ticket.objects.get(pk=self.tickets[1].pk).due_at)
+        self.assertIsNotNone(Ticket.objects.get(pk=self.tickets[0].pk).due_at)
+
+    def test_set_status_stops_and_restarts_deadlines(self):
+        self._run_action('set_status', status='closed')
+        self.assertFalse(Ticket.objects.filter(status='closed', due_at__isnull=False).exists())
+        untouched = Ticket.objects.get(pk=self.tickets[4].pk)
+        self.assertEqual(untouched.due_at, self.tickets[4].due_at)
+
+        self._run_action('set_status', status='open')
+        for ticket in Ticket.objects.filter(pk__in=[t.pk for t in self.tickets[:3]]):
+            self.assertAlmostEqual(ticket.due_at, compute_due_at('low'), delta=timedelta(seconds=30))
+
+    def test_assign_owner(self):
+        other = User.objects.create_user(username='other', email='other@example.com', password='x')
+        self._run_action('assign_owner', owner_id=other.pk)
+        self.assertEqual(Ticket.objects.filter(owner=other).count(), 3)
+
+        self._run_action('assign_owner', owner_id=other.pk + 100)
+        self.assertEqual(Ticket.objects.filter(owner=other).count(), 3)
+
+    def test_action_without_value_changes_nothing(self):
+        self._run_action('set_status')
+        self.assertFalse(Ticket.objects.exclude(status='new').exists())
+
+
+class IdempotentCreateTicketTest(PerformanceBudgetMixin, APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='testuser', email='test@example.com', password='testpass123'
+        )
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse('ticket:create-ticket')
+        self.data = {
+            'name': 'Printer on fire',
+            'description': 'The printer on floor two is on fire',
+            'source': 'email',
+        }
+
+    def _post(self, data=None, key='retry-1'):
+        return self.client.post(self.url, data or self.data, format='json', HTTP_IDEMPOTENCY_KEY=key)
+
+    def test_retry_replays_the_stored_response(self):
+        first = self._post()
+        self.assertEqual(first.status_code, status.HTTP_201_CREATED)
+        self.assertFalse(first.has_header('Idempotent-Replayed'))
+
+        # One index lookup for the key, no validation or insert
+        with self.assertQueryBudget(1):
+            retry = self._post()
+        self.assertEqual(retry.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(retry['Idempotent-Replayed'], 'true')
+        self.assertEqual(retry.data, first.data)
+        self.assertEqual(Ticket.objects.count(), 1)
+        self.assertEqual(IdempotencyKey.objects.get().ticket_id, first.data['data']['id'])
+
+    def test_reused_key_with_different_data(self):
+        self._post()
+        response = self._post({**self.data, 'name': 'Another printer'})
+        self.assertEqual(response.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY)
+        self.assertEqual(Ticket.objects.count(), 1)
+
+    def test_keys_are_per_user(self):
+        self._post()
+        other = User.objects.create_user(username='other', email='other@example.com', password='x')
+        self.client.force_authenticate(user=other)
+        response = self._post()
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertFalse(response.has_header('Idempotent-Replayed'))
+
+    def test_failed_create_does_not_keep_the_key(self):
+        response = self._post({'name': 'No description'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(IdempotencyKey.objects.exists())
+        self.assertEqual(self._post().status_code, status.HTTP_201_CREATED)
+
+    def test_malformed_body_gets_the_error_envelope(self):
+        without_key = self.client.post(self.url, '{"name": ', content_type='application/json')
+        with_key = self.client.post(
+            self.url, '{"name": ', content_type='application/json', HTTP_IDEMPOTENCY_KEY='retry-1'
+        )
+        self.assertEqual(with_key.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(with_key.data, without_key.data)
+        self.assertEqual(with_key.data['status'], 'error')
+        self.assertFalse(IdempotencyKey.objects.exists())
+
+    def test_invalid_key(self):
+        response = self._post(key='x' * 256)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Ticket.objects.exists())
+
+    def test_concurrent_duplicate_replays_the_winner(self):
+        first = self._post()
+        # The key row isn't visible yet when the second request looks it up,
+        # so it creates a ticket and loses on the unique constraint
+        with mock.patch.object(idempotency, 'get_stored', side_effect=[None, IdempotencyKey.objects.get()]):
+            response = self._post()
+        self.assertEqual(response['Idempotent-Replayed'], 'true')
+        self.assertEqual(response.data, first.data)
+        self.assertEqual(Ticket.objects.count(), 1)
+
+    def test_expired_keys(self):
+        self._post()
+        IdempotencyKey.objects.update(created_at=timezone.now() - timedelta(hours=25))
+        response = self._post()
+        self.assertFalse(response.has_header('Idempotent-Replayed'))
+        self.assertEqual(Ticket.objects.count(), 2)
+
+        IdempotencyKey.objects.update(created_at=timezone.now() - timedelta(hours=25))
+        out = StringIO()
+        call_command('purge_idempotency_keys', '--batch-size', '1', stdout=out)
+        self.assertIn('Deleted 1 expired', out.getvalue())
+        self.assertFalse(IdempotencyKey.objects.exists())
@@ -1,15 +1,24 @@
 from django.urls import path, include
-from rest_framework.routers import DefaultRouter
-from .views import CreateTicketAPIView, TicketListAPIView, UpdateTicketAPIView
+from rest_framework.routers import SimpleRouter
+from .views import (
+    CreateTicketAPIView,
+    TicketBatchAPIView,
+    TicketDetailAPIView,
+    TicketListAPIView,
+    UpdateTicketAPIView,
+)
 
 app_name = 'ticket'
 
-router = DefaultRouter()
+# SimpleRouter has no API root view, the root path serves batch fetches
+router = SimpleRouter()
 # We'll use router if we need to add more endpoints later
 
 urlpatterns = [
+    path('', TicketBatchAPIView.as_view(), name='ticket-batch'),
     path('', include(router.urls)),
     path('create/', CreateTicketAPIView.as_view(), name='create-ticket'),
     path('list/', TicketListAPIView.as_view(), name='ticket-list'),
+    path('<int:pk>/', TicketDetailAPIView.as_view(), name='ticket-detail'),
     path('<int:pk>/update/', UpdateTicketAPIView.as_view(), name='update-ticket'),  # New update endpoint
 ]
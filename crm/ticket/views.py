@@ -1,13 +1,41 @@
+from django.conf import settings
+from django.db import IntegrityError, transaction
 from django.shortcuts import render
 from rest_framework import generics, status
+from rest_framework.exceptions import ParseError
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
+from . import idempotency
+from .dedup import find_duplicate, fingerprint_ticket
 from .models import Ticket
-from .serializers import TicketSerializer
+from .serializers import TicketSerializer, normalize_ticket_data
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Largest value of the bigint primary key
+MAX_TICKET_ID = 2 ** 63 - 1
+
+
+def parse_ticket_id(value):
+    """
+    Return ``value`` as a ticket id, or None unless it is a whole number
+    (or a string of digits) within the primary key range
+    """
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, float):
+        if not value.is_integer():
+            return None
+        value = int(value)
+    elif isinstance(value, str):
+        if not value.isascii() or not value.isdigit():
+            return None
+        value = int(value)
+    elif not isinstance(value, int):
+        return None
+    return value if 1 <= value <= MAX_TICKET_ID else None
+
 # Create your views here.
 
 class TicketListAPIView(generics.ListAPIView):
@@ -24,7 +52,8 @@ class TicketListAPIView(generics.ListAPIView):
         - owner: Filter by owner ID
         - priority: Filter by priority
         """
-        queryset = Ticket.objects.all()
+        # Join the owner so serializing it doesn't cost a query per ticket
+        queryset = Ticket.objects.select_related('owner')
         
         # Filter by status if provided
         status = self.request.query_params.get('status', None)
@@ -44,6 +73,73 @@ class TicketListAPIView(generics.ListAPIView):
         # Order by most recent first
         return queryset.order_by('-created_at')
 
+class TicketDetailAPIView(generics.RetrieveAPIView):
+    """
+    API endpoint that returns a single ticket.
+    """
+    queryset = Ticket.objects.select_related('owner')
+    serializer_class = TicketSerializer
+    permission_classes = [IsAuthenticated]
+
+
+class TicketBatchAPIView(generics.GenericAPIView):
+    """
+    API endpoint that returns several tickets by id in one query.
+    
+    GET /api/tickets/?ids=3,1,2
+    POST /api/tickets/ {"ids": [3, 1, 2]}
+    
+    Returns:
+    {
+        "data": [<ticket 3>, <ticket 1>],
+        "missing": [2]
+    }
+    
+    Tickets are returned in the requested order, ids that don't exist are
+    listed in "missing". At most TICKET_BATCH_MAX_IDS ids per request.
+    """
+    queryset = Ticket.objects.select_related('owner')
+    serializer_class = TicketSerializer
+    permission_classes = [IsAuthenticated]
+    
+    def get(self, request, *args, **kwargs):
+        ids = request.query_params.get('ids', '')
+        return self.fetch([value.strip() for value in ids.split(',') if value.strip()])
+    
+    def post(self, request, *args, **kwargs):
+        ids = request.data.get('ids') if hasattr(request.data, 'get') else None
+        if not isinstance(ids, list):
+            return self.error('ids must be a list of ticket ids')
+        return self.fetch(ids)
+    
+    def error(self, message):
+        return Response(
+            {
+                'status': 'error',
+                'message': message
+            },
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    def fetch(self, raw_ids):
+        if not raw_ids:
+            return self.error('ids is required')
+        parsed = [parse_ticket_id(value) for value in raw_ids]
+        if None in parsed:
+            return self.error(f'ids must be integers between 1 and {MAX_TICKET_ID}')
+        # Drop repeated ids but keep the requested order
+        ids = list(dict.fromkeys(parsed))
+        if len(ids) > settings.TICKET_BATCH_MAX_IDS:
+            return self.error(f'At most {settings.TICKET_BATCH_MAX_IDS} ids per request')
+        
+        tickets = self.get_queryset().in_bulk(ids)
+        found = [tickets[ticket_id] for ticket_id in ids if ticket_id in tickets]
+        return Response({
+            'data': self.get_serializer(found, many=True).data,
+            'missing': [ticket_id for ticket_id in ids if ticket_id not in tickets]
+        })
+
+
 class CreateTicketAPIView(generics.CreateAPIView):
     """
     API endpoint that allows tickets to be created.
@@ -52,34 +148,110 @@ class CreateTicketAPIView(generics.CreateAPIView):
     serializer_class = TicketSerializer
     permission_classes = [IsAuthenticated]
     
-    def perform_create(self, serializer):
+    def perform_create(self, serializer, **extra):
         # Set the owner to the current user if not provided
-        serializer.save(owner=self.request.user)
+        serializer.save(owner=self.request.user, **extra)
 
     def create(self, request, *args, **kwargs):
+        key = request.headers.get(idempotency.HEADER)
+        if key is None:
+            return self.create_ticket(request)
+        if not key or len(key) > idempotency.MAX_KEY_LENGTH:
+            return Response(
+                {
+                    'status': 'error',
+                    'message': f'{idempotency.HEADER} must be 1 to {idempotency.MAX_KEY_LENGTH} characters'
+                },
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            request_hash = idempotency.hash_request(request.data)
+        except ParseError as e:
+            # Same envelope create_ticket() answers a malformed body with
+            return Response(
+                {
+                    'status': 'error',
+                    'message': 'Failed to create ticket',
+                    'errors': e.get_full_details()
+                },
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        stored = idempotency.get_stored(request.user, key)
+        if stored is not None:
+            return self.replay(stored, request_hash)
+
+        try:
+            with transaction.atomic():
+                response = self.create_ticket(request)
+                if not status.is_success(response.status_code):
+                    # Don't keep the key, the client may retry with corrected data
+                    transaction.set_rollback(True)
+                    return response
+                idempotency.store(request.user, key, request_hash, response, response.data['data']['id'])
+        except IntegrityError:
+            # A concurrent request with the same key committed first,
+            # our ticket was rolled back with the key row
+            stored = idempotency.get_stored(request.user, key)
+            if stored is None:
+                return Response(
+                    {
+                        'status': 'error',
+                        'message': 'A request with this idempotency key is in progress'
+                    },
+                    status=status.HTTP_409_CONFLICT
+                )
+            return self.replay(stored, request_hash)
+        return response
+
+    def replay(self, stored, request_hash):
+        if stored.request_hash != request_hash:
+            return Response(
+                {
+                    'status': 'error',
+                    'message': 'Idempotency key was already used with different data'
+                },
+                status=status.HTTP_422_UNPROCESSABLE_ENTITY
+            )
+        logger.info(f"Replayed ticket creation for idempotency key {stored.key}")
+        return Response(
+            stored.response_body,
+            status=stored.response_status,
+            headers={idempotency.REPLAYED_HEADER: 'true'}
+        )
+
+    def create_ticket(self, request):
         try:
             logger.info(f"Processing ticket creation request from user {request.user.email}")
             logger.debug(f"Request data: {request.data}")
             
-            # Create a mutable copy of the request data
-            data = request.data.copy()
-            
-            # Ensure the source is lowercase to match our choices
-            if 'source' in data:
-                data['source'] = data['source'].lower()
-                
-            # Set default status if not provided
-            if 'status' not in data:
-                data['status'] = 'open'
-                
-            # Set default priority if not provided
-            if 'priority' not in data:
-                data['priority'] = 'medium'
+            # Lowercase the source/status/priority and set their defaults
+            # on a mutable copy of the request data
+            data = normalize_ticket_data(request.data.copy())
             
             serializer = self.get_serializer(data=data)
             serializer.is_valid(raise_exception=True)
             
-            self.perform_create(serializer)
+            # Look for a recent open ticket this one duplicates
+            fingerprint, signature = fingerprint_ticket(serializer.validated_data)
+            duplicate_of = find_duplicate(fingerprint, signature)
+            if duplicate_of and settings.TICKET_DEDUP['ACTION'] == 'reject':
+                logger.info(f"Rejected duplicate of ticket {duplicate_of}")
+                return Response(
+                    {
+                        'status': 'error',
+                        'message': 'Duplicate of an open ticket',
+                        'duplicate_of': duplicate_of
+                    },
+                    status=status.HTTP_409_CONFLICT
+                )
+            
+            self.perform_create(
+                serializer,
+                fingerprint=fingerprint,
+                shingle_signature=signature,
+                duplicate_of_id=duplicate_of
+            )
             headers = self.get_success_headers(serializer.data)
             
             logger.info(f"Ticket created successfully. ID: {serializer.data.get('id')}")
@@ -119,7 +291,7 @@ class UpdateTicketAPIView(generics.UpdateAPIView):
     """
     API endpoint that allows tickets to be updated.
     """
-    queryset = Ticket.objects.all()
+    queryset = Ticket.objects.select_related('owner')
     serializer_class = TicketSerializer
     permission_classes = [IsAuthenticated]
     
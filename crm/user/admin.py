@@ -1,10 +1,52 @@
 from django.contrib import admin
+from django.contrib.auth.admin import UserAdmin
+from django.contrib.auth.forms import UserChangeForm, UserCreationForm
+
+from crm.paginators import EstimatedCountPaginator
 
-# Register your models here.
 from .models import Employee
 from .models import VerificationCode
 
-admin.site.register(Employee)
-admin.site.register(VerificationCode)
+
+class EmployeeCreationForm(UserCreationForm):
+    class Meta(UserCreationForm.Meta):
+        model = Employee
+        fields = ('username', 'email', 'first_name', 'last_name', 'employee_type')
+
+
+class EmployeeChangeForm(UserChangeForm):
+    class Meta(UserChangeForm.Meta):
+        model = Employee
+
+
+@admin.register(Employee)
+class EmployeeAdmin(UserAdmin):
+    form = EmployeeChangeForm
+    add_form = EmployeeCreationForm
+    list_display = ('username', 'email', 'first_name', 'last_name', 'employee_type', 'is_staff', 'is_active')
+    # Indexed or boolean columns only, the groups filter joins the m2m table
+    list_filter = ('employee_type', 'is_staff', 'is_active')
+    # Also used by the ticket owner autocomplete
+    search_fields = ('username', 'email', 'first_name', 'last_name')
+    ordering = ('username',)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    fieldsets = UserAdmin.fieldsets + (
+        ('CRM', {'fields': ('employee_type', 'phone_number', 'industry_type', 'country')}),
+    )
+    add_fieldsets = (
+        (None, {
+            'classes': ('wide',),
+            'fields': (
+                'username', 'email', 'first_name', 'last_name', 'employee_type',
+                'password1', 'password2',
+            ),
+        }),
+    )
 
 
+@admin.register(VerificationCode)
+class VerificationCodeAdmin(admin.ModelAdmin):
+    list_display = ('email', 'code', 'created_at', 'is_used')
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
@@ -0,0 +1,54 @@
+"""
+Short-lived cache of successful logins.
+
+Clients that log in again and again with the same credentials (token
+refreshes) skip the password hasher for LOGIN_CACHE_TIMEOUT seconds. Only
+an HMAC of the credentials is used as cache key, and an entry is ignored
+as soon as the user's password hash changes or the user is deactivated.
+The entry holds a digest of the password hash, never the hash itself.
+"""
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.utils.crypto import constant_time_compare, salted_hmac
+
+User = get_user_model()
+
+KEY_SALT = 'user.login_cache'
+
+
+def _timeout():
+    return getattr(settings, 'LOGIN_CACHE_TIMEOUT', 0)
+
+
+def _cache_key(username, password):
+    digest = salted_hmac(KEY_SALT, f'{username}\0{password}', algorithm='sha256').hexdigest()
+    return f'login:{digest}'
+
+
+def _password_digest(user):
+    return salted_hmac(KEY_SALT, user.password, algorithm='sha256').hexdigest()
+
+
+def get_cached_login(username, password):
+    """Return the user for recently verified credentials, or None"""
+    if not _timeout():
+        return None
+    key = _cache_key(username, password)
+    entry = cache.get(key)
+    if entry is None:
+        return None
+
+    user_id, password_digest = entry
+    user = User.objects.filter(pk=user_id, is_active=True).first()
+    if user is None or not constant_time_compare(_password_digest(user), password_digest):
+        cache.delete(key)
+        return None
+    return user
+
+
+def remember_login(username, password, user):
+    """Remember credentials that were just verified by the password hasher"""
+    timeout = _timeout()
+    if timeout:
+        cache.set(_cache_key(username, password), (user.pk, _password_digest(user)), timeout)
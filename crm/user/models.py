@@ -21,6 +21,7 @@ class Employee(AbstractUser):
         max_length=20,
         choices=EmployeeType.choices,
         default=EmployeeType.LEADS,
+        db_index=True,
         help_text=_("Type of employee access level")
     )
 
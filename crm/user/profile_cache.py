@@ -0,0 +1,45 @@
+"""
+Cache of the profile payload served by UserProfileView.
+
+Entries are keyed by user id and hold the profile dict together with its
+ETag. They are deleted whenever the Employee is saved or deleted (see
+user/signals.py), so with a shared cache backend a cached profile is never
+stale.
+"""
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+
+PROFILE_FIELDS = [
+    'id', 'email', 'first_name', 'last_name', 'username',
+    'phone_number', 'industry_type', 'country',
+]
+
+
+def _cache_key(user_id):
+    return f'user-profile:{user_id}'
+
+
+def build_profile(user):
+    return {field: getattr(user, field) for field in PROFILE_FIELDS}
+
+
+def get_cached_profile(user_id):
+    """Return (profile, etag) for the user, or None when not cached"""
+    return cache.get(_cache_key(user_id))
+
+
+def cache_profile(user):
+    """Build, cache and return (profile, etag) for the user"""
+    profile = build_profile(user)
+    payload = json.dumps(profile, sort_keys=True, default=str).encode()
+    etag = f'"{hashlib.sha256(payload).hexdigest()[:32]}"'
+    entry = (profile, etag)
+    cache.set(_cache_key(user.pk), entry, getattr(settings, 'PROFILE_CACHE_TIMEOUT', 3600))
+    return entry
+
+
+def invalidate_profile(user_id):
+    cache.delete(_cache_key(user_id))
@@ -0,0 +1,11 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Employee
+from .profile_cache import invalidate_profile
+
+
+@receiver([post_save, post_delete], sender=Employee)
+def invalidate_cached_profile(sender, instance, **kwargs):
+    """Drop the cached profile whenever the employee changes"""
+    invalidate_profile(instance.pk)
@@ -1,3 +1,170 @@
-from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import get_hasher, make_password
+from django.core.cache import cache
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import RefreshToken
 
-# Create your tests here.
+from crm.budgets import PerformanceBudgetMixin
+from user.login_cache import _cache_key, get_cached_login
+from user.models import VerificationCode
+
+User = get_user_model()
+
+
+class UserEndpointBudgetTest(PerformanceBudgetMixin, APITestCase):
+    """Query and time budgets for every URL in user/urls.py"""
+    USER_COUNT = 200
+    PASSWORD = 'testpass123'
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            username='budget', email='budget@example.com', password=cls.PASSWORD
+        )
+        User.objects.bulk_create([
+            User(username=f'user{i}', email=f'user{i}@example.com', password=cls.user.password)
+            for i in range(cls.USER_COUNT - 1)
+        ])
+
+    def authenticate(self):
+        token = RefreshToken.for_user(self.user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+
+    def test_register_budget(self):
+        data = {
+            'username': 'new', 'email': 'new@example.com', 'password': 'newpass12345',
+            'first_name': 'New', 'last_name': 'User', 'employee_type': 'tickets',
+        }
+        # Unique checks for username and email, then the INSERT
+        with self.assertQueryBudget(3), self.assertTimeBudget(2.0):
+            response = self.client.post(reverse('register'), data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    def test_login_budget(self):
+        data = {'username': 'budget', 'password': self.PASSWORD}
+        with self.assertQueryBudget(1), self.assertTimeBudget(2.0):
+            response = self.client.post(reverse('login'), data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_generate_verification_code_budget(self):
+        with self.assertQueryBudget(3), self.assertTimeBudget(0.5):
+            response = self.client.post(
+                reverse('generate-verification-code'), {'email': self.user.email}, format='json'
+            )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    def test_verify_code_budget(self):
+        verification = VerificationCode.generate_code(self.user.email)
+        data = {'code': verification.code, 'new_password': 'resetpass123'}
+        with self.assertQueryBudget(4), self.assertTimeBudget(2.0):
+            response = self.client.post(reverse('verify-code'), data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_profile_budget(self):
+        self.authenticate()
+        with self.assertQueryBudget(1), self.assertTimeBudget(0.5):
+            response = self.client.get(reverse('user-profile'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_user_list_budget(self):
+        self.authenticate()
+        # Authentication plus a single query, whatever the number of users
+        with self.assertQueryBudget(2), self.assertTimeBudget(1.0):
+            response = self.client.get(reverse('user-list'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), self.USER_COUNT)
+
+
+# The cache tests must not depend on the LOGIN_CACHE_TIMEOUT of the settings in use
+@override_settings(LOGIN_CACHE_TIMEOUT=60)
+class LoginHashingTest(APITestCase):
+    PASSWORD = 'testpass123'
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            username='hashing', email='hashing@example.com', password=self.PASSWORD
+        )
+
+    def login(self, password=None):
+        return self.client.post(
+            reverse('login'),
+            {'username': 'hashing', 'password': password or self.PASSWORD},
+            format='json',
+        )
+
+    def test_login_upgrades_legacy_hash(self):
+        self.user.password = make_password(self.PASSWORD, hasher='pbkdf2_sha1')
+        self.user.save(update_fields=['password'])
+
+        response = self.login()
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.password.startswith(f'{get_hasher().algorithm}$'))
+
+    def test_cached_login_is_dropped_after_password_change(self):
+        self.assertEqual(self.login().status_code, status.HTTP_200_OK)
+        self.user.set_password('changedpass123')
+        self.user.save()
+
+        self.assertEqual(self.login().status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(self.login('changedpass123').status_code, status.HTTP_200_OK)
+
+    def test_cache_does_not_hold_the_password_hash(self):
+        self.assertEqual(self.login().status_code, status.HTTP_200_OK)
+        entry = cache.get(_cache_key('hashing', self.PASSWORD))
+        self.assertEqual(entry[0], self.user.pk)
+        self.assertNotIn(self.user.password, entry)
+        self.assertEqual(get_cached_login('hashing', self.PASSWORD), self.user)
+
+
+class UserProfileCacheTest(PerformanceBudgetMixin, APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            username='profile', email='profile@example.com', password='testpass123',
+            first_name='Pro', last_name='File'
+        )
+        token = RefreshToken.for_user(self.user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        self.url = reverse('user-profile')
+
+    def test_revalidation_returns_304_without_queries(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['first_name'], 'Pro')
+        self.assertIn('private', response['Cache-Control'])
+        etag = response['ETag']
+
+        with self.assertQueryBudget(0):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response['ETag'], etag)
+
+    def test_saving_the_user_invalidates_the_profile(self):
+        etag = self.client.get(self.url)['ETag']
+        self.user.first_name = 'Changed'
+        self.user.save()
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['first_name'], 'Changed')
+        self.assertNotEqual(response['ETag'], etag)
+
+    @override_settings(DATABASE_READ_REPLICA='replica')
+    def test_cache_is_filled_from_the_primary(self):
+        # The test database has no replica alias, routing the read there would fail
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['first_name'], 'Pro')
+
+    def test_inactive_user_is_rejected(self):
+        self.user.is_active = False
+        self.user.save()
+
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
@@ -3,10 +3,17 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 from django.contrib.auth import authenticate
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.utils.http import parse_etags
 from .serializers import RegisterSerializer, LoginSerializer
+from rest_framework_simplejwt.authentication import JWTStatelessUserAuthentication
 from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework.permissions import AllowAny, IsAuthenticated
+from crm.db_routers import PRIMARY
 from .models import VerificationCode, Employee
+from .login_cache import get_cached_login, remember_login
+from .profile_cache import cache_profile, get_cached_profile
 
 # user/views.py
 class RegisterView(APIView):
@@ -35,7 +42,12 @@ class LoginView(APIView):
             username = serializer.validated_data['username']
             password = serializer.validated_data['password']
             
-            user = authenticate(username=username, password=password)
+            # Repeated logins with the same credentials skip the password hasher
+            user = get_cached_login(username, password)
+            if user is None:
+                user = authenticate(username=username, password=password)
+                if user:
+                    remember_login(username, password, user)
             
             if user:
                 refresh = RefreshToken.for_user(user)
@@ -79,7 +91,7 @@ class GenerateVerificationCodeView(APIView):
             )
         
         # Check if email exists in the database
-        if not CustomUser.objects.filter(email=email).exists():
+        if not Employee.objects.filter(email=email).exists():
             return Response(
                 {"error": "Email not registered"}, 
                 status=status.HTTP_404_NOT_FOUND
@@ -167,8 +179,8 @@ class VerifyCodeView(APIView):
             
             # Get the user by email from the verification record
             try:
-                user = CustomUser.objects.get(email=verification.email)
-            except CustomUser.DoesNotExist:
+                user = Employee.objects.get(email=verification.email)
+            except Employee.DoesNotExist:
                 return Response(
                     {"error": "User account not found"},
                     status=status.HTTP_404_NOT_FOUND
@@ -201,6 +213,7 @@ class UserProfileView(APIView):
     
     Headers:
     Authorization: Bearer <access_token>
+    If-None-Match: <etag from a previous response> (optional)
     
     Returns:
     {
@@ -213,21 +226,42 @@ class UserProfileView(APIView):
         "industry_type": "Technology",
         "country": "United States"
     }
+    
+    The profile is cached per user and served with an ETag, a request whose
+    If-None-Match still matches gets an empty 304. The token is validated
+    without loading the user, so a cached profile costs no database query.
     """
+    authentication_classes = [JWTStatelessUserAuthentication]
     permission_classes = [IsAuthenticated]
     
     def get(self, request):
-        user = request.user
-        return Response({
-            'id': user.id,
-            'email': user.email,
-            'first_name': user.first_name,
-            'last_name': user.last_name,
-            'username': user.username,
-            'phone_number': user.phone_number,
-            'industry_type': user.industry_type,
-            'country': user.country
-        })
+        user_id = request.user.id
+        cached = get_cached_profile(user_id)
+        if cached is None:
+            # The token alone doesn't prove the account still exists and is active.
+            # Read the primary, a lagging replica right after an edit would put
+            # the old profile back in the shared cache.
+            user = Employee.objects.using(PRIMARY).filter(pk=user_id, is_active=True).first()
+            if user is None:
+                return Response(
+                    {'detail': 'User not found or inactive'},
+                    status=status.HTTP_401_UNAUTHORIZED
+                )
+            cached = cache_profile(user)
+        
+        profile, etag = cached
+        headers = {
+            'ETag': etag,
+            'Cache-Control': 'private, no-cache',
+            'Vary': 'Authorization',
+        }
+        
+        # If-None-Match uses the weak comparison, ignore W/ prefixes
+        client_etags = parse_etags(request.headers.get('If-None-Match', ''))
+        if etag in (tag.removeprefix('W/') for tag in client_etags):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        
+        return Response(profile, headers=headers)
         
 
 class UserListView(APIView):